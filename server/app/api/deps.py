@@ -0,0 +1,31 @@
+"""
+Shared API Dependencies
+Service singletons are created once in the application lifespan and stored on app.state
+"""
+
+from fastapi import Request
+
+from app.services.reddit_service import RedditService
+from app.services.sentiment_service import SentimentService
+from app.services.trading_service import TradingService
+from app.services.twitter_service import TwitterService
+
+
+def get_trading_service(request: Request) -> TradingService:
+    """Dependency returning the application-wide TradingService"""
+    return request.app.state.trading_service
+
+
+def get_twitter_service(request: Request) -> TwitterService:
+    """Dependency returning the application-wide TwitterService"""
+    return request.app.state.twitter_service
+
+
+def get_reddit_service(request: Request) -> RedditService:
+    """Dependency returning the application-wide RedditService"""
+    return request.app.state.reddit_service
+
+
+def get_sentiment_service(request: Request) -> SentimentService:
+    """Dependency returning the application-wide SentimentService"""
+    return request.app.state.sentiment_service
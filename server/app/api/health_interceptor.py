@@ -0,0 +1,53 @@
+"""
+Health Check Interceptor
+Pure ASGI middleware that answers liveness probes before they reach FastAPI
+"""
+
+HEALTH_PATHS = frozenset({"/api/v1/health/", "/healthz", "/readyz"})
+
+_HEALTHY_BODY = b'{"status":"healthy"}'
+
+_OK_START = {
+    "type": "http.response.start",
+    "status": 200,
+    "headers": [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(_HEALTHY_BODY)).encode()),
+    ],
+}
+_OK_BODY = {"type": "http.response.body", "body": _HEALTHY_BODY}
+
+_NOT_ALLOWED_START = {
+    "type": "http.response.start",
+    "status": 405,
+    "headers": [
+        (b"allow", b"GET"),
+        (b"content-length", b"0"),
+    ],
+}
+_EMPTY_BODY = {"type": "http.response.body", "body": b""}
+
+
+class HealthCheckInterceptor:
+    """
+    Short-circuit health probes with a pre-encoded response.
+
+    Probe traffic skips the middleware stack, route matching and JSON
+    serialization entirely. Every other scope (including lifespan) is
+    passed through to the wrapped application untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in HEALTH_PATHS:
+            if scope["method"] == "GET":
+                await send(_OK_START)
+                await send(_OK_BODY)
+            else:
+                await send(_NOT_ALLOWED_START)
+                await send(_EMPTY_BODY)
+            return
+
+        await self.app(scope, receive, send)
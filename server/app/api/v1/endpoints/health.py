@@ -2,43 +2,122 @@
 Health Check Endpoints
 """
 
-from fastapi import APIRouter
-from datetime import datetime
+import asyncio
+import time
+from typing import Optional, Tuple
+
+import orjson
+from fastapi import APIRouter, Request, Response
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.logging import setup_logging
+from app.db.database import engine
+from app.utils.helpers import utc_now_iso
+
+logger = setup_logging()
 
 router = APIRouter()
 
+# Detailed health snapshots are shared by all callers for this long (seconds)
+DETAILED_HEALTH_TTL = 1.0
+
+# Upper bound for each dependency probe (seconds)
+HEALTH_PROBE_TIMEOUT = 0.5
+
+# Pre-encoded body for the basic health check
+_HEALTHY_BODY = b'{"status":"healthy"}'
+
+# (monotonic time the snapshot was taken, encoded JSON body)
+_detailed_cache: Optional[Tuple[float, bytes]] = None
+_detailed_lock = asyncio.Lock()
+
+# In-flight broker probe, shared so a slow broker never has more than one call outstanding
+_broker_probe: Optional[asyncio.Future] = None
+
 
 @router.get("/")
 async def health_check():
-    """Basic health check"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-    }
+    """
+    Basic health check
+    Served by HealthCheckInterceptor in front of the app; kept for the API docs
+    """
+    # A fresh Response per call: middleware may append headers to a response's header list
+    return Response(content=_HEALTHY_BODY, media_type="application/json")
 
 
-@router.get("/detailed")
-async def detailed_health_check():
-    """Detailed health check with service status"""
-    from app.core.config import settings
-    from app.services.twitter_service import TwitterService
-    from app.services.trading_service import TradingService
+async def _probe_db():
+    """Round trip to the database"""
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def _probe_broker(trading_service):
+    """Trading API reachability, from the account snapshot cached for ACCOUNT_CACHE_TTL"""
+    global _broker_probe
+    if trading_service is None or trading_service.client is None:
+        return
+    # A timed-out probe keeps its worker thread until the broker answers; wait on that
+    # call instead of starting another one
+    if _broker_probe is None or _broker_probe.done():
+        _broker_probe = asyncio.ensure_future(trading_service._get_account())
+    await asyncio.shield(_broker_probe)
+
+
+async def _run_probe(probe) -> bool:
+    """Run a probe with a timeout, reporting failure instead of raising"""
+    try:
+        await asyncio.wait_for(probe, timeout=HEALTH_PROBE_TIMEOUT)
+        return True
+    except Exception as e:
+        logger.warning(f"Health probe failed: {e!r}")
+        return False
+
+
+async def _build_detailed_health(request: Request) -> bytes:
+    """Snapshot service state from the instances created at startup"""
+    state = request.app.state
+    twitter_service = getattr(state, "twitter_service", None)
+    trading_service = getattr(state, "trading_service", None)
     
-    twitter_service = TwitterService()
-    trading_service = TradingService()
+    # Probes run concurrently so the check takes max(latency), not the sum
+    db_ok, broker_ok = await asyncio.gather(
+        _run_probe(_probe_db()),
+        _run_probe(_probe_broker(trading_service)),
+    )
     
-    return {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
+    return orjson.dumps({
+        "status": "healthy" if db_ok and broker_ok else "degraded",
+        "timestamp": utc_now_iso(),
         "services": {
+            "database": {
+                "reachable": db_ok,
+            },
             "twitter": {
                 "configured": bool(settings.TWITTER_BEARER_TOKEN),
-                "monitoring": twitter_service.is_monitoring,
+                "monitoring": bool(twitter_service and twitter_service.is_monitoring),
             },
             "trading": {
                 "configured": bool(settings.ALPACA_API_KEY),
                 "enabled": settings.TRADING_ENABLED,
+                "reachable": broker_ok,
             },
         },
-    }
+    })
+
+
+@router.get("/detailed")
+async def detailed_health_check(request: Request):
+    """Detailed health check with service status (cached for DETAILED_HEALTH_TTL)"""
+    global _detailed_cache
+
+    cached = _detailed_cache
+    if cached is None or time.monotonic() - cached[0] >= DETAILED_HEALTH_TTL:
+        async with _detailed_lock:
+            # Another request may have refreshed the snapshot while we waited
+            cached = _detailed_cache
+            if cached is None or time.monotonic() - cached[0] >= DETAILED_HEALTH_TTL:
+                cached = (time.monotonic(), await _build_detailed_health(request))
+                _detailed_cache = cached
 
+    return Response(content=cached[1], media_type="application/json")
@@ -2,16 +2,22 @@
 Position Endpoints
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import bindparam, lambda_stmt, select
 from typing import List, Optional
-from pydantic import BaseModel
+import hashlib
+import orjson
+from pydantic import BaseModel, TypeAdapter
 from datetime import datetime
 
+from app.api.deps import get_trading_service
+from app.core.config import settings
 from app.db.database import get_db
 from app.db.models import Position
 from app.services.trading_service import TradingService
+from app.utils.pagination import stream_json_rows
 
 router = APIRouter()
 
@@ -30,37 +36,85 @@ class PositionResponse(BaseModel):
         from_attributes = True
 
 
+# Serializer for streamed chunks of the positions list
+_POSITION_LIST_ADAPTER = TypeAdapter(List[PositionResponse])
+
+# Core table for the positions list: rows come back as plain mappings, with no
+# ORM identity map, instance state or loader setup
+_positions_table = Position.__table__
+
+
+# Lookup by symbol, compiled once and reused with a new bound parameter per call
+_POSITION_BY_SYMBOL = lambda_stmt(
+    lambda: select(Position).where(Position.symbol == bindparam("symbol")).limit(1)
+)
+
+
+def _position_etag(position: Position) -> str:
+    """Weak validator over the returned values (a sync may rewrite a row within the same second)"""
+    values = orjson.dumps([
+        position.id,
+        position.quantity,
+        position.average_price,
+        position.current_price,
+        position.unrealized_pnl,
+        position.updated_at,
+    ])
+    return f'W/"{hashlib.blake2b(values, digest_size=16).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match list (or *) against our ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
 @router.get("/", response_model=List[PositionResponse])
 async def get_positions(
-    db: AsyncSession = Depends(get_db),
+    limit: int = Query(100, ge=1, le=1000),
+    after_id: Optional[int] = Query(None, ge=0, description="Return positions with id greater than this"),
+    trading_service: TradingService = Depends(get_trading_service),
 ):
-    """Get all current positions"""
-    trading_service = TradingService()
-    await trading_service.update_positions(db)
+    """Get current positions, paginated by id"""
+    # Positions are synced in the background; never wait on the broker here
+    trading_service.request_positions_refresh(settings.POSITION_SYNC_INTERVAL)
     
-    result = await db.execute(select(Position))
-    positions = result.scalars().all()
+    columns = _positions_table.c
+    query = select(*columns).order_by(columns.id).limit(limit)
+    if after_id is not None:
+        query = query.where(columns.id > after_id)
     
-    return positions
+    return StreamingResponse(
+        stream_json_rows(query, {}, PositionResponse, _POSITION_LIST_ADAPTER),
+        media_type="application/json",
+    )
 
 
 @router.get("/{symbol}", response_model=PositionResponse)
 async def get_position(
     symbol: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
+    trading_service: TradingService = Depends(get_trading_service),
 ):
-    """Get a specific position by symbol"""
-    trading_service = TradingService()
-    await trading_service.update_positions(db)
+    """Get a specific position by symbol (supports If-None-Match)"""
+    trading_service.request_positions_refresh(settings.POSITION_SYNC_INTERVAL)
     
-    result = await db.execute(
-        select(Position).where(Position.symbol == symbol)
-    )
+    result = await db.execute(_POSITION_BY_SYMBOL, {"symbol": symbol})
     position = result.scalar_one_or_none()
     
     if not position:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Position not found")
     
+    etag = _position_etag(position)
+    headers = {"etag": etag, "cache-control": "private, max-age=1"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    
     return position
-
@@ -6,19 +6,29 @@ Uses multiple free APIs with flexible rate limits:
 3. Yahoo Finance via yfinance (last resort)
 """
 
-from fastapi import APIRouter, HTTPException
-from typing import Optional, Dict, Tuple
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.responses import ORJSONResponse
+from typing import Any, Awaitable, Callable, Optional, Dict, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
 import httpx
-from datetime import datetime, timedelta
+import orjson
+from datetime import datetime
 import asyncio
+import random
+import time
 import logging
-from concurrent.futures import ThreadPoolExecutor
 from app.core.config import settings
+from app.core.exceptions import YfNotFoundError, YfRateLimitedError
+from app.services.http_clients import get_http_client
+from app.utils.helpers import utc_now_iso
 
 # Try to import yfinance and pandas, fallback to None if not available
 try:
     import yfinance as yf
     import pandas as pd
+    import requests
+    from requests.adapters import HTTPAdapter
     YFINANCE_AVAILABLE = True
 except ImportError:
     YFINANCE_AVAILABLE = False
@@ -26,110 +36,204 @@ except ImportError:
 
 logger = logging.getLogger("tradex")
 
-# Thread pool for running synchronous yfinance calls
-_executor = ThreadPoolExecutor(max_workers=5)
+# Concurrent yfinance calls allowed before Yahoo starts rate limiting
+YFINANCE_MAX_CONCURRENCY = 4
+_yf_semaphore = asyncio.Semaphore(YFINANCE_MAX_CONCURRENCY)
+
+# One keep-alive session for all yfinance calls instead of a new one per Ticker
+_yf_session = None
+if YFINANCE_AVAILABLE:
+    _yf_session = requests.Session()
+    _yf_session.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=20))
+
+
+def _yf_ticker(symbol_upper: str):
+    """
+    New Ticker on the shared session for each call
+    Ticker objects cache .info for their lifetime and aren't thread-safe, so they aren't reused
+    """
+    return yf.Ticker(symbol_upper, session=_yf_session)
 
 router = APIRouter()
 
-# In-memory cache for stock data (TTL: 60 seconds)
-_cache: Dict[str, Tuple[dict, datetime]] = {}
+# In-memory LRU cache for stock data (TTL: 60 seconds)
+# key -> (data, JSON-encoded data, fresh until, stale until) on the time.monotonic() clock
+_cache: "OrderedDict[str, Tuple[Any, bytes, float, float]]" = OrderedDict()
 CACHE_TTL = 60  # seconds
 STALE_CACHE_TTL = 3600  # 1 hour - return stale cache if within this time
+MAX_CACHE_ENTRIES = 4096  # least recently used entries are evicted beyond this
+REVALIDATE_GRACE = 30  # seconds past CACHE_TTL an entry is served while refreshed in the background
+
+# Symbols every provider reported as not found: symbol -> monotonic expiry
+_missing_symbols: "OrderedDict[str, float]" = OrderedDict()
+NEGATIVE_CACHE_TTL = 600  # seconds
+MAX_NEGATIVE_CACHE_ENTRIES = 512
+
+# Upstream loads currently running, keyed by cache key
+_inflight: Dict[str, asyncio.Task] = {}
+
+# Seconds to wait on Finnhub before also asking Alpha Vantage
+PROVIDER_HEDGE_DELAY = 0.3
+
+# Retries for transient provider failures (503/504) before giving up on a provider
+PROVIDER_RETRIES = 2
+PROVIDER_RETRY_BASE_DELAY = 0.25  # seconds, doubled per attempt plus jitter
 
 # API Keys (optional - some APIs work without keys)
 FINNHUB_API_KEY = getattr(settings, 'FINNHUB_API_KEY', '') or ''
 ALPHA_VANTAGE_API_KEY = getattr(settings, 'ALPHA_VANTAGE_API_KEY', '') or ''
 
+# Provider endpoints and the query parameters that never change between requests
+_FINNHUB_URL = "https://finnhub.io/api/v1/quote"
+_FINNHUB_BASE_PARAMS = {"token": FINNHUB_API_KEY} if FINNHUB_API_KEY else {}  # key is optional for free tier
+_ALPHA_VANTAGE_URL = "https://www.alphavantage.co/query"
+_ALPHA_VANTAGE_BASE_PARAMS = {"function": "GLOBAL_QUOTE", "apikey": ALPHA_VANTAGE_API_KEY}
+_YAHOO_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/"
 
-def _get_cached_data(cache_key: str, allow_stale: bool = False) -> Optional[dict]:
-    """Get data from cache if it's still valid, optionally return stale cache"""
-    if cache_key in _cache:
-        data, timestamp = _cache[cache_key]
-        age = datetime.utcnow() - timestamp
-        
-        # Return fresh cache
-        if age < timedelta(seconds=CACHE_TTL):
-            return data
-        
-        # Return stale cache if allowed and not too old
-        if allow_stale and age < timedelta(seconds=STALE_CACHE_TTL):
-            return data
-        
-        # Cache too old, remove it
-        if age >= timedelta(seconds=STALE_CACHE_TTL):
-            del _cache[cache_key]
+
+def _get_cached_entry(cache_key: str, allow_stale: bool = False) -> Optional[Tuple[Any, bytes, float, float]]:
+    """Get a cache entry if it's still valid, optionally return stale entries"""
+    entry = _cache.get(cache_key)
+    if entry is None:
+        return None
+    
+    now = time.monotonic()
+    
+    # Cache too old, remove it
+    if now >= entry[3]:
+        _cache.pop(cache_key, None)
+        return None
+    
+    # Return fresh cache, or stale cache if allowed
+    if now < entry[2] or allow_stale:
+        _cache.move_to_end(cache_key)
+        return entry
     
     return None
 
 
-def _set_cached_data(cache_key: str, data: dict):
-    """Store data in cache"""
-    _cache[cache_key] = (data, datetime.utcnow())
+def _get_cached_data(cache_key: str, allow_stale: bool = False) -> Optional[Any]:
+    """Get cached data (used where the payload has to be modified, e.g. stale responses)"""
+    entry = _get_cached_entry(cache_key, allow_stale)
+    return entry[0] if entry else None
+
+
+def _get_cached_body(cache_key: str) -> Optional[bytes]:
+    """Get the pre-encoded JSON body of a fresh cache entry"""
+    entry = _get_cached_entry(cache_key)
+    return entry[1] if entry else None
+
+
+def _get_revalidatable_body(cache_key: str) -> Optional[bytes]:
+    """Get the encoded body of an entry that expired less than REVALIDATE_GRACE seconds ago"""
+    entry = _cache.get(cache_key)
+    if entry is None:
+        return None
+    
+    if time.monotonic() < entry[2] + REVALIDATE_GRACE:
+        _cache.move_to_end(cache_key)
+        return entry[1]
+    
+    return None
+
+
+def _set_cached_data(cache_key: str, data: Any) -> bytes:
+    """Store data and its JSON encoding in cache, evicting the least recently used entry when full"""
+    body = orjson.dumps(data)
+    now = time.monotonic()
+    _cache[cache_key] = (data, body, now + CACHE_TTL, now + STALE_CACHE_TTL)
+    _cache.move_to_end(cache_key)
+    if len(_cache) > MAX_CACHE_ENTRIES:
+        _cache.popitem(last=False)
+    return body
+
+
+def _is_known_missing(symbol_upper: str) -> bool:
+    """Check whether a symbol recently came back as not found"""
+    expires = _missing_symbols.get(symbol_upper)
+    if expires is None:
+        return False
+    if time.monotonic() >= expires:
+        _missing_symbols.pop(symbol_upper, None)
+        return False
+    return True
 
 
-async def _fetch_finnhub_quote(symbol: str) -> dict:
+def _remember_missing(symbol_upper: str):
+    """Remember a not-found symbol so repeated lookups skip the provider chain"""
+    _missing_symbols[symbol_upper] = time.monotonic() + NEGATIVE_CACHE_TTL
+    _missing_symbols.move_to_end(symbol_upper)
+    if len(_missing_symbols) > MAX_NEGATIVE_CACHE_ENTRIES:
+        _missing_symbols.popitem(last=False)
+
+
+def _json_response(body: bytes, cache_status: str) -> Response:
+    """Send already-encoded JSON without another serialization pass"""
+    return Response(content=body, media_type="application/json", headers={"X-Cache": cache_status})
+
+
+@dataclass(slots=True)
+class Quote:
+    """Normalized provider result: latest quote plus the daily series behind it"""
+    symbol: str
+    price: float
+    previous_close: float
+    volume: int
+    high: float
+    low: float
+    open: float
+    timestamps: list
+    closes: list
+    volumes: list
+    dates: Optional[list] = None  # Pre-formatted by pandas; only yfinance history provides these
+
+
+async def _fetch_finnhub_quote(symbol_upper: str) -> Quote:
     """
     Fetch current stock quote from Finnhub API
     Free tier: 60 calls/minute, no API key required for basic usage
     """
-    symbol_upper = symbol.upper()
-    
-    # Finnhub API endpoint
-    url = f"https://finnhub.io/api/v1/quote"
     params = {"symbol": symbol_upper}
-    
-    # Add API key if available (optional for free tier)
-    if FINNHUB_API_KEY:
-        params["token"] = FINNHUB_API_KEY
+    params.update(_FINNHUB_BASE_PARAMS)
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, params=params)
-            
-            if response.status_code == 429:
-                raise HTTPException(
-                    status_code=429,
-                    detail="Finnhub API rate limit exceeded. Please try again in a moment."
-                )
-            
-            response.raise_for_status()
-            data = response.json()
-            
-            # Check if symbol is valid (Finnhub returns all zeros for invalid symbols)
-            if data.get("c") == 0 and data.get("o") == 0 and data.get("h") == 0:
-                raise HTTPException(status_code=404, detail=f"Stock symbol {symbol_upper} not found")
-            
-            current_price = data.get("c")  # Current price
-            previous_close = data.get("pc")  # Previous close
-            high = data.get("h")  # High
-            low = data.get("l")  # Low
-            open_price = data.get("o")  # Open
-            
-            if current_price is None or current_price == 0:
-                raise HTTPException(status_code=404, detail=f"Stock symbol {symbol_upper} not found")
-            
-            # Build response in same format as other APIs
-            return {
-                "chart": {
-                    "result": [{
-                        "meta": {
-                            "regularMarketPrice": float(current_price),
-                            "previousClose": float(previous_close) if previous_close else float(current_price),
-                            "regularMarketVolume": 0,  # Finnhub quote doesn't include volume
-                            "regularMarketDayHigh": float(high) if high else float(current_price),
-                            "regularMarketDayLow": float(low) if low else float(current_price),
-                            "regularMarketOpen": float(open_price) if open_price else float(current_price),
-                        },
-                        "timestamp": [int(datetime.utcnow().timestamp())],
-                        "indicators": {
-                            "quote": [{
-                                "close": [float(current_price)],
-                                "volume": [0],
-                            }]
-                        }
-                    }]
-                }
-            }
+        response = await get_http_client().get(_FINNHUB_URL, params=params)
+        
+        if response.status_code == 429:
+            raise HTTPException(
+                status_code=429,
+                detail="Finnhub API rate limit exceeded. Please try again in a moment."
+            )
+        
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        
+        # Check if symbol is valid (Finnhub returns all zeros for invalid symbols)
+        if data.get("c") == 0 and data.get("o") == 0 and data.get("h") == 0:
+            raise HTTPException(status_code=404, detail=f"Stock symbol {symbol_upper} not found")
+        
+        current_price = data.get("c")  # Current price
+        previous_close = data.get("pc")  # Previous close
+        high = data.get("h")  # High
+        low = data.get("l")  # Low
+        open_price = data.get("o")  # Open
+        
+        if current_price is None or current_price == 0:
+            raise HTTPException(status_code=404, detail=f"Stock symbol {symbol_upper} not found")
+        
+        price = float(current_price)
+        return Quote(
+            symbol=symbol_upper,
+            price=price,
+            previous_close=float(previous_close) if previous_close else price,
+            volume=0,  # Finnhub quote doesn't include volume
+            high=float(high) if high else price,
+            low=float(low) if low else price,
+            open=float(open_price) if open_price else price,
+            timestamps=[int(time.time())],
+            closes=[price],
+            volumes=[0],
+        )
     except HTTPException:
         raise
     except httpx.TimeoutException:
@@ -137,90 +241,75 @@ async def _fetch_finnhub_quote(symbol: str) -> dict:
     except httpx.RequestError as e:
         raise HTTPException(status_code=503, detail=f"Finnhub API error: {str(e)}")
     except Exception as e:
-        logger.error(f"Unexpected error fetching from Finnhub for {symbol_upper}: {str(e)}")
+        logger.error("Unexpected error fetching from Finnhub for %s: %s", symbol_upper, e)
         raise HTTPException(status_code=503, detail=f"Error fetching data from Finnhub: {str(e)}")
 
 
-async def _fetch_alpha_vantage_quote(symbol: str) -> dict:
+async def _fetch_alpha_vantage_quote(symbol_upper: str) -> Quote:
     """
     Fetch current stock quote from Alpha Vantage API
     Free tier: 5 calls/minute, 500 calls/day - requires API key (free to get)
     """
-    symbol_upper = symbol.upper()
-    
     if not ALPHA_VANTAGE_API_KEY:
         raise HTTPException(
             status_code=503,
             detail="Alpha Vantage API key not configured. Get a free key at https://www.alphavantage.co/support/#api-key"
         )
     
-    url = "https://www.alphavantage.co/query"
-    params = {
-        "function": "GLOBAL_QUOTE",
-        "symbol": symbol_upper,
-        "apikey": ALPHA_VANTAGE_API_KEY
-    }
+    params = {"symbol": symbol_upper}
+    params.update(_ALPHA_VANTAGE_BASE_PARAMS)
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, params=params)
-            
-            if response.status_code == 429:
-                raise HTTPException(
-                    status_code=429,
-                    detail="Alpha Vantage API rate limit exceeded (5 calls/minute). Please try again in a moment."
-                )
-            
-            response.raise_for_status()
-            data = response.json()
-            
-            # Check for API errors
-            if "Error Message" in data:
-                raise HTTPException(status_code=404, detail=f"Stock symbol {symbol_upper} not found")
-            
-            if "Note" in data:
-                # Rate limit message
-                raise HTTPException(
-                    status_code=429,
-                    detail="Alpha Vantage API rate limit exceeded. Please try again in a moment."
-                )
-            
-            quote = data.get("Global Quote", {})
-            if not quote:
-                raise HTTPException(status_code=404, detail=f"Stock symbol {symbol_upper} not found")
-            
-            current_price = quote.get("05. price")
-            previous_close = quote.get("08. previous close")
-            high = quote.get("03. high")
-            low = quote.get("04. low")
-            open_price = quote.get("02. open")
-            volume = quote.get("06. volume", "0")
-            
-            if not current_price or current_price == "None":
-                raise HTTPException(status_code=404, detail=f"Stock symbol {symbol_upper} not found")
-            
-            # Build response in same format as other APIs
-            return {
-                "chart": {
-                    "result": [{
-                        "meta": {
-                            "regularMarketPrice": float(current_price),
-                            "previousClose": float(previous_close) if previous_close and previous_close != "None" else float(current_price),
-                            "regularMarketVolume": int(volume) if volume and volume != "None" else 0,
-                            "regularMarketDayHigh": float(high) if high and high != "None" else float(current_price),
-                            "regularMarketDayLow": float(low) if low and low != "None" else float(current_price),
-                            "regularMarketOpen": float(open_price) if open_price and open_price != "None" else float(current_price),
-                        },
-                        "timestamp": [int(datetime.utcnow().timestamp())],
-                        "indicators": {
-                            "quote": [{
-                                "close": [float(current_price)],
-                                "volume": [int(volume) if volume and volume != "None" else 0],
-                            }]
-                        }
-                    }]
-                }
-            }
+        response = await get_http_client().get(_ALPHA_VANTAGE_URL, params=params)
+        
+        if response.status_code == 429:
+            raise HTTPException(
+                status_code=429,
+                detail="Alpha Vantage API rate limit exceeded (5 calls/minute). Please try again in a moment."
+            )
+        
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        
+        # Check for API errors
+        if "Error Message" in data:
+            raise HTTPException(status_code=404, detail=f"Stock symbol {symbol_upper} not found")
+        
+        if "Note" in data:
+            # Rate limit message
+            raise HTTPException(
+                status_code=429,
+                detail="Alpha Vantage API rate limit exceeded. Please try again in a moment."
+            )
+        
+        quote = data.get("Global Quote", {})
+        if not quote:
+            raise HTTPException(status_code=404, detail=f"Stock symbol {symbol_upper} not found")
+        
+        current_price = quote.get("05. price")
+        previous_close = quote.get("08. previous close")
+        high = quote.get("03. high")
+        low = quote.get("04. low")
+        open_price = quote.get("02. open")
+        volume = quote.get("06. volume", "0")
+        
+        if not current_price or current_price == "None":
+            raise HTTPException(status_code=404, detail=f"Stock symbol {symbol_upper} not found")
+        
+        price = float(current_price)
+        volume = int(volume) if volume and volume != "None" else 0
+        return Quote(
+            symbol=symbol_upper,
+            price=price,
+            previous_close=float(previous_close) if previous_close and previous_close != "None" else price,
+            volume=volume,
+            high=float(high) if high and high != "None" else price,
+            low=float(low) if low and low != "None" else price,
+            open=float(open_price) if open_price and open_price != "None" else price,
+            timestamps=[int(time.time())],
+            closes=[price],
+            volumes=[volume],
+        )
     except HTTPException:
         raise
     except httpx.TimeoutException:
@@ -228,19 +317,25 @@ async def _fetch_alpha_vantage_quote(symbol: str) -> dict:
     except httpx.RequestError as e:
         raise HTTPException(status_code=503, detail=f"Alpha Vantage API error: {str(e)}")
     except Exception as e:
-        logger.error(f"Unexpected error fetching from Alpha Vantage for {symbol_upper}: {str(e)}")
+        logger.error("Unexpected error fetching from Alpha Vantage for %s: %s", symbol_upper, e)
         raise HTTPException(status_code=503, detail=f"Error fetching data from Alpha Vantage: {str(e)}")
 
 
-def _fetch_yahoo_data_via_yfinance_sync(symbol: str, days: int = 30) -> dict:
+def _is_rate_limit_error(error_msg: str) -> bool:
+    """Classify a yfinance error message as a rate limit"""
+    lowered = error_msg.lower()
+    return "429" in error_msg or "rate" in lowered or "too many" in lowered
+
+
+def _fetch_yahoo_data_via_yfinance_sync(symbol_upper: str, days: int = 30) -> Quote:
     """
     Synchronous function to fetch data using yfinance library
     This runs in a thread pool since yfinance is synchronous
     Uses history method primarily (more reliable, less rate-limited) with info as fallback
+    Raises YfRateLimitedError / YfNotFoundError for the failures the caller maps to HTTP errors
     """
     try:
-        symbol_upper = symbol.upper()
-        ticker = yf.Ticker(symbol_upper)
+        ticker = _yf_ticker(symbol_upper)
         
         # Determine period for historical data
         if days <= 5:
@@ -260,10 +355,10 @@ def _fetch_yahoo_data_via_yfinance_sync(symbol: str, days: int = 30) -> dict:
         if hist.empty:
             # If history fails, try info as last resort
             try:
-                logger.debug(f"History empty for {symbol_upper}, trying info")
+                logger.debug("History empty for %s, trying info", symbol_upper)
                 info = ticker.info
                 if not info or len(info) == 0:
-                    raise ValueError(f"Stock symbol {symbol_upper} not found or no data available")
+                    raise YfNotFoundError(f"Stock symbol {symbol_upper} not found or no data available")
                 
                 current_price = info.get("currentPrice") or info.get("regularMarketPrice") or info.get("previousClose")
                 previous_close = info.get("previousClose") or info.get("regularMarketPreviousClose") or current_price
@@ -273,20 +368,21 @@ def _fetch_yahoo_data_via_yfinance_sync(symbol: str, days: int = 30) -> dict:
                 day_open = info.get("open") or info.get("regularMarketOpen") or current_price
                 
                 if current_price is None:
-                    raise ValueError(f"Stock symbol {symbol_upper} not found or no data available")
+                    raise YfNotFoundError(f"Stock symbol {symbol_upper} not found or no data available")
                 
                 # Create minimal chart data
-                timestamps = [int(datetime.utcnow().timestamp())]
+                timestamps = [int(time.time())]
+                dates = None
                 closes = [current_price]
                 volumes = [volume]
                 
+            except YfNotFoundError:
+                raise
             except Exception as info_error:
                 error_msg = str(info_error)
-                # Check if it's a rate limit error
-                if "429" in error_msg or "rate" in error_msg.lower() or "too many" in error_msg.lower():
-                    logger.warning(f"Rate limited when fetching info for {symbol_upper}")
-                    raise ValueError(f"Rate limited: {error_msg}")
-                raise ValueError(f"Stock symbol {symbol_upper} not found or no data available: {error_msg}")
+                if _is_rate_limit_error(error_msg):
+                    raise YfRateLimitedError(error_msg)
+                raise YfNotFoundError(f"Stock symbol {symbol_upper} not found or no data available: {error_msg}")
         else:
             # Get the most recent data points from history
             latest = hist.iloc[-1]
@@ -294,60 +390,54 @@ def _fetch_yahoo_data_via_yfinance_sync(symbol: str, days: int = 30) -> dict:
             
             current_price = float(latest["Close"])
             previous_close = float(previous["Close"])
-            volume = int(latest["Volume"]) if not pd.isna(latest["Volume"]) else 0
-            day_high = float(latest["High"]) if not pd.isna(latest["High"]) else current_price
-            day_low = float(latest["Low"]) if not pd.isna(latest["Low"]) else current_price
-            day_open = float(latest["Open"]) if not pd.isna(latest["Open"]) else current_price
+            # One fillna over the row instead of a pd.isna call per field
+            latest = latest.fillna({"Volume": 0, "High": current_price, "Low": current_price, "Open": current_price})
+            volume = int(latest["Volume"])
+            day_high = float(latest["High"])
+            day_low = float(latest["Low"])
+            day_open = float(latest["Open"])
             
             # Prepare chart data from history
-            timestamps = [int(ts.timestamp()) for ts in hist.index]
-            closes = [float(x) if not pd.isna(x) else None for x in hist["Close"].tolist()]
-            volumes = [int(x) if not pd.isna(x) else 0 for x in hist["Volume"].tolist()]
+            timestamps = (hist.index.asi8 // 1_000_000_000).tolist()
+            dates = hist.index.strftime("%Y-%m-%d").tolist()
+            # tolist() yields plain floats; NaN is the only value not equal to itself
+            closes = [None if x != x else x for x in hist["Close"].tolist()]
+            volumes = hist["Volume"].fillna(0).astype("int64").tolist()
         
-        # Build response in same format as API
-        return {
-            "chart": {
-                "result": [{
-                    "meta": {
-                        "regularMarketPrice": float(current_price),
-                        "previousClose": float(previous_close) if previous_close else float(current_price),
-                        "regularMarketVolume": int(volume),
-                        "regularMarketDayHigh": float(day_high),
-                        "regularMarketDayLow": float(day_low),
-                        "regularMarketOpen": float(day_open),
-                    },
-                    "timestamp": timestamps,
-                    "indicators": {
-                        "quote": [{
-                            "close": closes,
-                            "volume": volumes,
-                        }]
-                    }
-                }]
-            }
-        }
-    except ValueError as e:
-        error_msg = str(e)
-        # Check if it's a rate limit error
-        if "rate" in error_msg.lower() or "429" in error_msg or "too many" in error_msg.lower():
-            logger.warning(f"Rate limited when fetching {symbol}: {error_msg}")
-            raise ValueError(f"Rate limited: Please try again in a few moments")
-        logger.warning(f"yfinance fetch failed for {symbol}: {error_msg}")
-        raise ValueError(f"yfinance error: {error_msg}")
+        return Quote(
+            symbol=symbol_upper,
+            price=float(current_price),
+            previous_close=float(previous_close) if previous_close else float(current_price),
+            volume=int(volume),
+            high=float(day_high),
+            low=float(day_low),
+            open=float(day_open),
+            timestamps=timestamps,
+            closes=closes,
+            volumes=volumes,
+            dates=dates,
+        )
+    except YfRateLimitedError as e:
+        logger.info("Rate limited when fetching %s: %s", symbol_upper, e)
+        raise
+    except YfNotFoundError as e:
+        # Known failure (symbol not found / no data): no traceback needed
+        logger.info("yfinance fetch failed for %s: %s", symbol_upper, e)
+        raise
     except Exception as e:
         error_msg = str(e)
-        # Check for rate limiting in exception message
-        if "429" in error_msg or "rate" in error_msg.lower() or "too many" in error_msg.lower():
-            logger.warning(f"Rate limited when fetching {symbol}: {error_msg}")
-            raise ValueError(f"Rate limited: Please try again in a few moments")
-        logger.error(f"Unexpected error in yfinance fetch for {symbol}: {error_msg}", exc_info=True)
-        raise ValueError(f"yfinance error: {error_msg}")
+        if _is_rate_limit_error(error_msg):
+            logger.info("Rate limited when fetching %s: %s", symbol_upper, error_msg)
+            raise YfRateLimitedError(error_msg)
+        # Only unclassified failures are worth a traceback
+        logger.error("Unexpected error in yfinance fetch for %s: %s", symbol_upper, error_msg, exc_info=True)
+        raise
 
 
-async def _fetch_yahoo_data_via_yfinance(symbol: str, days: int = 30) -> dict:
+async def _fetch_yahoo_data_via_yfinance(symbol: str, days: int = 30) -> Quote:
     """
     Fetch data using yfinance library (more reliable than direct API calls)
-    Runs the synchronous yfinance call in a thread pool
+    Runs the synchronous yfinance call in a worker thread
     """
     if not YFINANCE_AVAILABLE:
         raise HTTPException(
@@ -355,66 +445,55 @@ async def _fetch_yahoo_data_via_yfinance(symbol: str, days: int = 30) -> dict:
             detail="yfinance library not available. Please install it: pip install yfinance"
         )
     
+    if not pd:
+        raise HTTPException(
+            status_code=503,
+            detail="pandas library not available. Please install it: pip install pandas"
+        )
+    
+    # One executor round trip; the worker classifies failures itself
     try:
-        if not pd:
-            raise HTTPException(
-                status_code=503,
-                detail="pandas library not available. Please install it: pip install pandas"
-            )
-        
-        # Run the synchronous yfinance call in a thread pool
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            _executor,
-            _fetch_yahoo_data_via_yfinance_sync,
-            symbol,
-            days
+        async with _yf_semaphore:
+            return await asyncio.to_thread(_fetch_yahoo_data_via_yfinance_sync, symbol, days)
+    except YfRateLimitedError:
+        raise HTTPException(
+            status_code=429,
+            detail="Yahoo Finance API rate limit exceeded. Please try again in a few moments."
         )
-        return result
-    except ValueError as e:
-        # Convert ValueError to appropriate HTTPException
-        error_msg = str(e)
-        logger.warning(f"yfinance ValueError for {symbol}: {error_msg}")
-        if "rate" in error_msg.lower() or "429" in error_msg or "too many" in error_msg.lower():
-            raise HTTPException(
-                status_code=429,
-                detail="Yahoo Finance API rate limit exceeded. Please try again in a few moments."
-            )
-        if "not found" in error_msg.lower() or "no data" in error_msg.lower():
-            raise HTTPException(status_code=404, detail=f"Stock symbol {symbol} not found")
-        # Re-raise as ValueError to be handled by caller
-        raise
+    except YfNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Stock symbol {symbol} not found")
     except Exception as e:
         error_msg = str(e)
-        logger.error(f"yfinance fetch error for {symbol}: {error_msg}", exc_info=True)
+        logger.error("yfinance fetch error for %s: %s", symbol, error_msg)
         raise HTTPException(status_code=503, detail=f"Error fetching data: {error_msg}")
 
 
-async def _fetch_yahoo_data_via_api(symbol: str, days: int = 30, max_retries: int = 3) -> dict:
+async def _fetch_yahoo_data_via_api(symbol: str, days: int = 30, max_retries: int = 3) -> Quote:
     """
     Fetch data from Yahoo Finance API with retry logic (fallback method)
     """
-    url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol.upper()}?interval=1d&range={days}d"
+    url = _YAHOO_CHART_URL + symbol
+    params = {"interval": "1d", "range": f"{days}d"}
     
     for attempt in range(max_retries):
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(url)
-                
-                # If we get rate limited, wait and retry
-                if response.status_code == 429:
-                    wait_time = (2 ** attempt) * 2  # Exponential backoff: 2s, 4s, 8s
-                    if attempt < max_retries - 1:
-                        await asyncio.sleep(wait_time)
-                        continue
-                    else:
-                        raise HTTPException(
-                            status_code=429,
-                            detail="Yahoo Finance API rate limit exceeded. Please try again in a few moments."
-                        )
-                
-                response.raise_for_status()
-                return response.json()
+            response = await get_http_client().get(url, params=params)
+            
+            # If we get rate limited, wait and retry
+            if response.status_code == 429:
+                wait_time = (2 ** attempt) * 2  # Exponential backoff: 2s, 4s, 8s
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(wait_time)
+                    continue
+                else:
+                    raise HTTPException(
+                        status_code=429,
+                        detail="Yahoo Finance API rate limit exceeded. Please try again in a few moments."
+                    )
+            
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+            break
         except httpx.TimeoutException:
             if attempt < max_retries - 1:
                 await asyncio.sleep(2 ** attempt)
@@ -425,82 +504,147 @@ async def _fetch_yahoo_data_via_api(symbol: str, days: int = 30, max_retries: in
                 await asyncio.sleep(2 ** attempt)
                 continue
             raise HTTPException(status_code=503, detail=f"Network error: {str(e)}")
+    else:
+        raise HTTPException(status_code=500, detail="Failed to fetch data after retries")
     
-    raise HTTPException(status_code=500, detail="Failed to fetch data after retries")
+    return _quote_from_chart(symbol, data)
 
 
-async def _fetch_stock_data(symbol: str, days: int = 30) -> dict:
+def _quote_from_chart(symbol_upper: str, data: dict) -> Quote:
+    """Convert a raw Yahoo Finance chart payload into a Quote"""
+    if not data.get("chart") or not data["chart"].get("result"):
+        logger.warning("No chart data returned for %s", symbol_upper)
+        raise HTTPException(status_code=404, detail=f"Stock symbol {symbol_upper} not found")
+    
+    result = data["chart"]["result"][0]
+    meta = result.get("meta", {})
+    quotes = (result.get("indicators", {}).get("quote") or [{}])[0]
+    
+    current_price = meta.get("regularMarketPrice")
+    if current_price is None:
+        logger.warning("Current price is None for %s", symbol_upper)
+        raise HTTPException(status_code=404, detail=f"Incomplete data for symbol {symbol_upper}: current price not available")
+    
+    previous_close = meta.get("previousClose")
+    if previous_close is None:
+        logger.warning("Previous close is None for %s, using current price", symbol_upper)
+        previous_close = current_price
+    
+    return Quote(
+        symbol=symbol_upper,
+        price=current_price,
+        previous_close=previous_close,
+        volume=meta.get("regularMarketVolume", 0),
+        high=meta.get("regularMarketDayHigh", current_price),
+        low=meta.get("regularMarketDayLow", current_price),
+        open=meta.get("regularMarketOpen", current_price),
+        timestamps=result.get("timestamp") or [],
+        closes=quotes.get("close") or [],
+        volumes=quotes.get("volume") or [],
+    )
+
+
+async def _with_retry(fetch: Callable[[str], Awaitable[Quote]], symbol: str) -> Quote:
     """
-    Fetch stock data using multiple APIs with fallback chain:
-    1. Finnhub (60 calls/minute) - fastest and most reliable
-    2. Alpha Vantage (5 calls/minute) - good fallback
-    3. Yahoo Finance via yfinance - last resort
+    Call a provider fetch, retrying transient failures (503/504) with jittered backoff
+    Rate limits and 404s are returned to the caller immediately
     """
-    symbol_upper = symbol.upper()
+    for attempt in range(PROVIDER_RETRIES + 1):
+        try:
+            return await fetch(symbol)
+        except HTTPException as e:
+            if e.status_code not in (503, 504) or attempt == PROVIDER_RETRIES:
+                raise
+        await asyncio.sleep(PROVIDER_RETRY_BASE_DELAY * 2 ** attempt + random.random() * 0.1)
+
+
+async def _fetch_quote_hedged(symbol_upper: str) -> Optional[Quote]:
+    """
+    Hedged quote request across Finnhub and Alpha Vantage
+    Finnhub starts immediately; Alpha Vantage (only when configured) starts after
+    PROVIDER_HEDGE_DELAY, or as soon as Finnhub fails. The first success wins and the
+    other request is cancelled. A 404 from either provider is raised immediately.
+    Returns None when every provider failed for another reason.
+    """
+    providers = [("Finnhub", _fetch_finnhub_quote)]
+    if ALPHA_VANTAGE_API_KEY:
+        providers.append(("Alpha Vantage", _fetch_alpha_vantage_quote))
     
-    # Try Finnhub first (best rate limits: 60 calls/minute)
+    pending: Dict[asyncio.Task, str] = {}
     try:
-        logger.debug(f"Trying Finnhub for {symbol_upper}")
-        return await _fetch_finnhub_quote(symbol_upper)
-    except HTTPException as e:
-        if e.status_code == 404:
-            raise  # Don't fallback for 404
-        if e.status_code == 429:
-            logger.warning(f"Finnhub rate limited for {symbol_upper}, trying Alpha Vantage")
-        else:
-            logger.warning(f"Finnhub failed for {symbol_upper}: {str(e)}, trying Alpha Vantage")
-    except Exception as e:
-        logger.warning(f"Finnhub error for {symbol_upper}: {str(e)}, trying Alpha Vantage")
+        for index, (name, fetch) in enumerate(providers):
+            logger.debug("Trying %s for %s", name, symbol_upper)
+            pending[asyncio.create_task(_with_retry(fetch, symbol_upper))] = name
+            is_last = index == len(providers) - 1
+            
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=None if is_last else PROVIDER_HEDGE_DELAY,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    provider = pending.pop(task)
+                    try:
+                        return task.result()
+                    except HTTPException as e:
+                        if e.status_code == 404:
+                            raise  # Don't fallback for 404
+                        if e.status_code == 429:
+                            logger.warning("%s rate limited for %s", provider, symbol_upper)
+                        else:
+                            logger.warning("%s failed for %s: %s", provider, symbol_upper, e)
+                    except Exception as e:
+                        logger.warning("%s error for %s: %s", provider, symbol_upper, e)
+                
+                # Hedge delay elapsed or the running provider failed: start the next one
+                if not is_last:
+                    break
+    finally:
+        for task in pending:
+            task.cancel()
     
-    # Try Alpha Vantage (5 calls/minute)
+    return None
+
+
+async def _fetch_stock_data(symbol_upper: str, days: int = 30) -> Quote:
+    """
+    Fetch stock data using multiple APIs with fallback chain:
+    1. Finnhub (60 calls/minute) - fastest and most reliable
+    2. Alpha Vantage (5 calls/minute) - hedged against Finnhub
+    3. Yahoo Finance via yfinance - last resort
+    Symbols that come back as not found are remembered for NEGATIVE_CACHE_TTL
+    """
     try:
-        logger.debug(f"Trying Alpha Vantage for {symbol_upper}")
-        return await _fetch_alpha_vantage_quote(symbol_upper)
+        return await _fetch_from_providers(symbol_upper, days)
     except HTTPException as e:
         if e.status_code == 404:
-            raise  # Don't fallback for 404
-        if e.status_code == 429:
-            logger.warning(f"Alpha Vantage rate limited for {symbol_upper}, trying yfinance")
-        elif e.status_code == 503 and "API key not configured" in str(e.detail):
-            logger.info(f"Alpha Vantage not configured for {symbol_upper}, trying yfinance")
-        else:
-            logger.warning(f"Alpha Vantage failed for {symbol_upper}: {str(e)}, trying yfinance")
-    except Exception as e:
-        logger.warning(f"Alpha Vantage error for {symbol_upper}: {str(e)}, trying yfinance")
+            _remember_missing(symbol_upper)
+        raise
+
+
+async def _fetch_from_providers(symbol_upper: str, days: int) -> Quote:
+    """Run the provider fallback chain for _fetch_stock_data"""
+    # Finnhub and Alpha Vantage race as a hedged request; 404 propagates from either
+    data = await _fetch_quote_hedged(symbol_upper)
+    if data is not None:
+        return data
     
     # Fallback to yfinance (last resort - often rate limited)
     if YFINANCE_AVAILABLE:
         try:
-            logger.debug(f"Trying yfinance for {symbol_upper}")
+            logger.debug("Trying yfinance for %s", symbol_upper)
             return await _fetch_yahoo_data_via_yfinance(symbol_upper, days)
         except HTTPException as e:
             if e.status_code == 404:
                 raise  # Don't fallback for 404
             if e.status_code == 429:
                 raise  # Don't fallback for rate limits, let endpoint handle stale cache
-            logger.warning(f"yfinance failed for {symbol_upper}: {str(e)}")
-        except ValueError as e:
-            error_msg = str(e)
-            if "rate" in error_msg.lower() or "429" in error_msg or "too many" in error_msg.lower():
-                raise HTTPException(
-                    status_code=429,
-                    detail="All stock data APIs rate limited. Please try again in a few moments."
-                )
-            if "not found" in error_msg.lower() or "no data" in error_msg.lower():
-                raise HTTPException(status_code=404, detail=f"Stock symbol {symbol_upper} not found")
-            logger.warning(f"yfinance ValueError for {symbol_upper}: {error_msg}")
-        except Exception as e:
-            error_msg = str(e)
-            if "429" in error_msg or "rate" in error_msg.lower() or "too many" in error_msg.lower():
-                raise HTTPException(
-                    status_code=429,
-                    detail="All stock data APIs rate limited. Please try again in a few moments."
-                )
-            logger.warning(f"yfinance error for {symbol_upper}: {error_msg}")
+            logger.warning("yfinance failed for %s: %s", symbol_upper, e)
     
     # Final fallback to direct Yahoo Finance API
     try:
-        logger.debug(f"Trying direct Yahoo Finance API for {symbol_upper}")
+        logger.debug("Trying direct Yahoo Finance API for %s", symbol_upper)
         return await _fetch_yahoo_data_via_api(symbol_upper, days)
     except HTTPException as e:
         if e.status_code == 404 or e.status_code == 429:
@@ -508,6 +652,107 @@ async def _fetch_stock_data(symbol: str, days: int = 30) -> dict:
         raise
 
 
+async def _load_stock_data(symbol_upper: str, cache_key: str) -> bytes:
+    """Fetch a fresh quote, build the response and cache it; returns the encoded body"""
+    # Fetch data using multiple APIs with fallback
+    logger.debug("Fetching fresh data for %s", symbol_upper)
+    quote = await _fetch_stock_data(symbol_upper, days=30)
+    
+    logger.debug("Data for %s: price=%s, previousClose=%s", symbol_upper, quote.price, quote.previous_close)
+    
+    change = quote.price - quote.previous_close
+    change_percent = (change / quote.previous_close) * 100 if quote.previous_close != 0 else 0
+    
+    response_data = {
+        "symbol": symbol_upper,
+        "price": quote.price,
+        "change": change,
+        "changePercent": change_percent,
+        "volume": quote.volume,
+        "high": quote.high,
+        "low": quote.low,
+        "open": quote.open,
+        "previousClose": quote.previous_close,
+        "timestamp": utc_now_iso(),
+    }
+    
+    # Cache the response
+    body = _set_cached_data(cache_key, response_data)
+    logger.info("Successfully fetched and cached data for %s", symbol_upper)
+    
+    return body
+
+
+async def _load_stock_history(symbol: str, symbol_upper: str, days: int, cache_key: str) -> bytes:
+    """Fetch fresh history, build the chart rows and cache them; returns the encoded body"""
+    # Fetch data using multiple APIs with fallback
+    quote = await _fetch_stock_data(symbol_upper, days=days)
+    
+    timestamps = quote.timestamps
+    closes = quote.closes
+    if not timestamps or not closes:
+        raise HTTPException(status_code=404, detail=f"No historical data available for symbol {symbol}")
+    
+    volumes = quote.volumes
+    if len(volumes) < len(closes):
+        volumes = volumes + [0] * (len(closes) - len(volumes))
+    
+    dates = quote.dates
+    if dates is None:
+        # Quote providers and the chart API only return epoch timestamps
+        dates = [datetime.fromtimestamp(ts).strftime("%Y-%m-%d") for ts in timestamps]
+    
+    chart_data = [
+        {"date": date, "price": close, "volume": volume}
+        for date, close, volume in zip(dates, closes, volumes)
+        if close is not None
+    ]
+    
+    # Cache the response
+    return _set_cached_data(cache_key, chart_data)
+
+
+def _start_load(cache_key: str, load: Callable[[], Awaitable]) -> asyncio.Task:
+    """Return the in-flight load for a cache key, starting it if none is running"""
+    task = _inflight.get(cache_key)
+    if task is None:
+        task = asyncio.ensure_future(load())
+        _inflight[cache_key] = task
+        task.add_done_callback(lambda t: _finish_inflight(cache_key, t))
+    return task
+
+
+async def _single_flight(cache_key: str, load: Callable[[], Awaitable]):
+    """
+    Share one in-flight load per cache key among concurrent callers
+    The load runs as its own task, so a caller disconnecting does not cancel it for the others
+    """
+    return await asyncio.shield(_start_load(cache_key, load))
+
+
+def _refresh_in_background(cache_key: str, load: Callable[[], Awaitable]):
+    """Stale-while-revalidate: refresh an entry without making the caller wait"""
+    if cache_key not in _inflight:
+        logger.debug("Refreshing %s in the background", cache_key)
+        _start_load(cache_key, load).add_done_callback(
+            lambda t: _log_refresh_failure(cache_key, t)
+        )
+
+
+def _log_refresh_failure(cache_key: str, task: asyncio.Task):
+    """Report a failed background refresh (no request is waiting on it)"""
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Background refresh failed for %s: %s", cache_key, task.exception())
+
+
+def _finish_inflight(cache_key: str, task: asyncio.Task):
+    """Forget a completed load; retrieve its exception in case every waiter went away"""
+    if _inflight.get(cache_key) is task:
+        del _inflight[cache_key]
+    if not task.cancelled():
+        task.exception()
+
+
 @router.get("/data/{symbol}")
 async def get_stock_data(symbol: str):
     """
@@ -518,95 +763,63 @@ async def get_stock_data(symbol: str):
     symbol_upper = symbol.upper()
     cache_key = f"data_{symbol_upper}"
     
-    logger.info(f"Fetching stock data for {symbol_upper}")
+    logger.info("Fetching stock data for %s", symbol_upper)
     
     # Check cache first (fresh)
-    cached = _get_cached_data(cache_key, allow_stale=False)
-    if cached:
-        logger.debug(f"Returning cached data for {symbol_upper}")
-        return cached
+    body = _get_cached_body(cache_key)
+    if body is not None:
+        logger.debug("Returning cached data for %s", symbol_upper)
+        return _json_response(body, "HIT")
+    
+    # Recently expired: serve it now and refresh behind the response
+    body = _get_revalidatable_body(cache_key)
+    if body is not None:
+        _refresh_in_background(cache_key, lambda: _load_stock_data(symbol_upper, cache_key))
+        return _json_response(body, "STALE")
+    
+    # Known-invalid symbols fail fast instead of walking every provider again
+    if _is_known_missing(symbol_upper):
+        raise HTTPException(status_code=404, detail=f"Stock symbol {symbol_upper} not found")
     
     try:
-        # Fetch data using multiple APIs with fallback
-        logger.debug(f"Fetching fresh data for {symbol_upper}")
-        data = await _fetch_stock_data(symbol_upper, days=30)
-        
-        if not data.get("chart") or not data["chart"].get("result") or len(data["chart"]["result"]) == 0:
-            logger.warning(f"No chart data returned for {symbol_upper}")
-            raise HTTPException(status_code=404, detail=f"Stock symbol {symbol_upper} not found")
-        
-        result = data["chart"]["result"][0]
-        meta = result.get("meta", {})
-        
-        current_price = meta.get("regularMarketPrice")
-        previous_close = meta.get("previousClose")
-        
-        logger.debug(f"Data for {symbol_upper}: price={current_price}, previousClose={previous_close}")
-        
-        if current_price is None:
-            logger.warning(f"Current price is None for {symbol_upper}")
-            raise HTTPException(status_code=404, detail=f"Incomplete data for symbol {symbol_upper}: current price not available")
-        
-        if previous_close is None:
-            logger.warning(f"Previous close is None for {symbol_upper}, using current price")
-            previous_close = current_price
-        
-        change = current_price - previous_close
-        change_percent = (change / previous_close) * 100 if previous_close != 0 else 0
-        
-        response_data = {
-            "symbol": symbol_upper,
-            "price": current_price,
-            "change": change,
-            "changePercent": change_percent,
-            "volume": meta.get("regularMarketVolume", 0),
-            "high": meta.get("regularMarketDayHigh", current_price),
-            "low": meta.get("regularMarketDayLow", current_price),
-            "open": meta.get("regularMarketOpen", current_price),
-            "previousClose": previous_close,
-            "timestamp": datetime.utcnow().isoformat(),
-        }
-        
-        # Cache the response
-        _set_cached_data(cache_key, response_data)
-        logger.info(f"Successfully fetched and cached data for {symbol_upper}")
-        
-        return response_data
+        # Concurrent misses for the same symbol share one upstream fetch
+        body = await _single_flight(cache_key, lambda: _load_stock_data(symbol_upper, cache_key))
+        return _json_response(body, "MISS")
     except HTTPException as e:
         # If rate limited, try to return stale cache
         if e.status_code == 429:
             stale_cache = _get_cached_data(cache_key, allow_stale=True)
             if stale_cache:
-                logger.info(f"Rate limited for {symbol_upper}, returning stale cache")
-                stale_cache["stale"] = True  # Mark as stale
+                logger.info("Rate limited for %s, returning stale cache", symbol_upper)
+                stale_cache = dict(stale_cache, stale=True)  # Mark as stale on a copy of the cached dict
                 stale_cache["message"] = "Rate limited - showing cached data"
-                return stale_cache
-        logger.error(f"HTTPException for {symbol_upper}: {e.status_code} - {e.detail}")
+                return ORJSONResponse(stale_cache, headers={"X-Cache": "STALE"})
+        logger.error("HTTPException for %s: %s - %s", symbol_upper, e.status_code, e.detail)
         raise
     except ValueError as e:
         # Handle ValueError from yfinance (usually means symbol not found)
         error_msg = str(e)
-        logger.error(f"ValueError for {symbol_upper}: {error_msg}")
+        logger.error("ValueError for %s: %s", symbol_upper, error_msg)
         if "not found" in error_msg.lower() or "no data" in error_msg.lower():
             raise HTTPException(status_code=404, detail=f"Stock symbol {symbol_upper} not found")
         # Try stale cache before failing
         stale_cache = _get_cached_data(cache_key, allow_stale=True)
         if stale_cache:
-            logger.warning(f"Error fetching {symbol_upper}, returning stale cache: {error_msg}")
-            stale_cache["stale"] = True
+            logger.warning("Error fetching %s, returning stale cache: %s", symbol_upper, error_msg)
+            stale_cache = dict(stale_cache, stale=True)
             stale_cache["message"] = f"Error fetching fresh data - showing cached data: {error_msg}"
-            return stale_cache
+            return ORJSONResponse(stale_cache, headers={"X-Cache": "STALE"})
         raise HTTPException(status_code=404, detail=f"Stock symbol {symbol_upper} not found: {error_msg}")
     except Exception as e:
         # On any other error, try stale cache
         error_msg = str(e)
-        logger.error(f"Unexpected error fetching {symbol_upper}: {error_msg}", exc_info=True)
+        logger.error("Unexpected error fetching %s: %s", symbol_upper, error_msg, exc_info=True)
         stale_cache = _get_cached_data(cache_key, allow_stale=True)
         if stale_cache:
-            logger.warning(f"Error fetching {symbol_upper}, returning stale cache: {error_msg}")
-            stale_cache["stale"] = True
+            logger.warning("Error fetching %s, returning stale cache: %s", symbol_upper, error_msg)
+            stale_cache = dict(stale_cache, stale=True)
             stale_cache["message"] = f"Error fetching fresh data - showing cached data: {error_msg}"
-            return stale_cache
+            return ORJSONResponse(stale_cache, headers={"X-Cache": "STALE"})
         raise HTTPException(status_code=500, detail=f"Internal error: {error_msg}")
 
 
@@ -628,50 +841,37 @@ async def get_stock_history(symbol: str, days: int = 30):
     cache_key = f"history_{symbol_upper}_{days}"
     
     # Check cache first (fresh)
-    cached = _get_cached_data(cache_key, allow_stale=False)
-    if cached:
-        return cached
+    body = _get_cached_body(cache_key)
+    if body is not None:
+        return _json_response(body, "HIT")
+    
+    # Recently expired: serve it now and refresh behind the response
+    body = _get_revalidatable_body(cache_key)
+    if body is not None:
+        _refresh_in_background(cache_key, lambda: _load_stock_history(symbol, symbol_upper, days, cache_key))
+        return _json_response(body, "STALE")
+    
+    # Known-invalid symbols fail fast instead of walking every provider again
+    if _is_known_missing(symbol_upper):
+        raise HTTPException(status_code=404, detail=f"Stock symbol {symbol_upper} not found")
     
     try:
-        # Fetch data using multiple APIs with fallback
-        data = await _fetch_stock_data(symbol_upper, days=days)
-        
-        if not data.get("chart") or not data["chart"].get("result") or len(data["chart"]["result"]) == 0:
-            raise HTTPException(status_code=404, detail=f"Stock symbol {symbol} not found")
-        
-        result = data["chart"]["result"][0]
-        timestamps = result.get("timestamp", [])
-        quotes = result.get("indicators", {}).get("quote", [{}])[0]
-        
-        if not timestamps or not quotes:
-            raise HTTPException(status_code=404, detail=f"No historical data available for symbol {symbol}")
-        
-        chart_data = []
-        for i, timestamp in enumerate(timestamps):
-            if i < len(quotes.get("close", [])) and quotes["close"][i] is not None:
-                chart_data.append({
-                    "date": datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d"),
-                    "price": quotes["close"][i],
-                    "volume": quotes.get("volume", [0])[i] if i < len(quotes.get("volume", [])) else 0,
-                })
-        
-        # Cache the response
-        _set_cached_data(cache_key, chart_data)
-        
-        return chart_data
+        # Concurrent misses for the same symbol share one upstream fetch
+        body = await _single_flight(cache_key, lambda: _load_stock_history(symbol, symbol_upper, days, cache_key))
+        return _json_response(body, "MISS")
     except HTTPException as e:
         # If rate limited, try to return stale cache
         if e.status_code == 429:
-            stale_cache = _get_cached_data(cache_key, allow_stale=True)
-            if stale_cache:
-                logger.info(f"Rate limited for {symbol_upper} history, returning stale cache")
-                return stale_cache
+            stale_entry = _get_cached_entry(cache_key, allow_stale=True)
+            if stale_entry:
+                logger.info("Rate limited for %s history, returning stale cache", symbol_upper)
+                return _json_response(stale_entry[1], "STALE")
         raise
     except Exception as e:
         # On any other error, try stale cache
-        stale_cache = _get_cached_data(cache_key, allow_stale=True)
-        if stale_cache:
-            logger.warning(f"Error fetching {symbol_upper} history, returning stale cache: {str(e)}")
-            return stale_cache
+        stale_entry = _get_cached_entry(cache_key, allow_stale=True)
+        if stale_entry:
+            logger.warning("Error fetching %s history, returning stale cache: %s", symbol_upper, e)
+            return _json_response(stale_entry[1], "STALE")
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
@@ -2,19 +2,25 @@
 Trade Endpoints
 """
 
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import Select, bindparam, select, desc, func, tuple_
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from datetime import datetime
 
+from app.api.deps import get_trading_service
 from app.db.database import get_db
-from app.db.models import Trade
+from app.db.models import Trade, Tweet
+from app.services.response_cache import cache_delete, cached_response
 from app.services.trading_service import TradingService
+from app.utils.pagination import STREAM_MIN_ROWS, encode_cursor, decode_cursor, stream_json_rows
 
 router = APIRouter()
 
+TRADE_STATS_CACHE_KEY = "trades:stats"
+
 
 class TradeResponse(BaseModel):
     """Trade response model"""
@@ -34,29 +40,102 @@ class TradeResponse(BaseModel):
         from_attributes = True
 
 
+# Columns backing TradeResponse, selected directly so list rows skip ORM materialization
+_TRADE_COLUMNS = tuple(Trade.__table__.c[name] for name in TradeResponse.model_fields)
+
+# Serializes whole list pages in pydantic-core instead of per-item response_model handling
+_TRADE_LIST_ADAPTER = TypeAdapter(List[TradeResponse])
+
+
+def _trades_query(has_symbol: bool, has_status: bool, has_cursor: bool) -> Select:
+    """List query for one combination of filters; filter values are bound at execution"""
+    query = select(*_TRADE_COLUMNS).order_by(desc(Trade.created_at), desc(Trade.id))
+    if has_symbol:
+        query = query.where(Trade.symbol == bindparam("symbol"))
+    if has_status:
+        query = query.where(Trade.status == bindparam("status"))
+    if has_cursor:
+        # Seek past the previous page instead of scanning and discarding OFFSET rows
+        query = query.where(
+            tuple_(Trade.created_at, Trade.id) < tuple_(
+                bindparam("cursor_created_at", type_=Trade.created_at.type),
+                bindparam("cursor_id", type_=Trade.id.type),
+            )
+        )
+    return query
+
+
+# Every filter shape is built once at import, so requests only bind values and add OFFSET/LIMIT
+_TRADE_QUERIES = {
+    (has_symbol, has_status, has_cursor): _trades_query(has_symbol, has_status, has_cursor)
+    for has_symbol in (False, True)
+    for has_status in (False, True)
+    for has_cursor in (False, True)
+}
+
+
 @router.get("/", response_model=List[TradeResponse])
 async def get_trades(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
     symbol: Optional[str] = None,
     status: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
 ):
-    """Get trades with optional filtering"""
-    query = select(Trade).order_by(desc(Trade.created_at))
-    
+    """
+    Get trades with optional filtering
+    Full pages carry an X-Next-Cursor header; pass it back as `cursor` for the next page
+    """
+    params = {}
     if symbol:
-        query = query.where(Trade.symbol == symbol)
-    
+        params["symbol"] = symbol
     if status:
-        query = query.where(Trade.status == status)
+        params["status"] = status
+    if cursor:
+        try:
+            params["cursor_created_at"], params["cursor_id"] = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
     
-    query = query.offset(skip).limit(limit)
+    query = _TRADE_QUERIES[bool(symbol), bool(status), bool(cursor)]
+    if not cursor:
+        query = query.offset(skip)
     
-    result = await db.execute(query)
-    trades = result.scalars().all()
+    if limit >= STREAM_MIN_ROWS:
+        # Find the page's last row first (an index-only probe) so X-Next-Cursor can be
+        # sent ahead of the streamed body
+        result = await db.execute(
+            query.with_only_columns(Trade.created_at, Trade.id).offset((0 if cursor else skip) + limit - 1).limit(1),
+            params,
+        )
+        boundary = result.first()
+        headers = {}
+        if boundary is None:
+            query = query.limit(limit)
+        else:
+            headers["X-Next-Cursor"] = encode_cursor(*boundary)
+            # End the page at the boundary row instead of LIMIT, so rows inserted between
+            # the two queries can't push unseen rows past the cursor
+            query = query.where(tuple_(Trade.created_at, Trade.id) >= tuple_(*boundary))
+        return StreamingResponse(
+            stream_json_rows(query, params, TradeResponse, _TRADE_LIST_ADAPTER),
+            media_type="application/json",
+            headers=headers,
+        )
     
-    return trades
+    result = await db.execute(query.limit(limit), params)
+    rows = result.mappings().all()
+    
+    headers = {}
+    if len(rows) == limit:
+        last = rows[-1]
+        headers["X-Next-Cursor"] = encode_cursor(last["created_at"], last["id"])
+    
+    # Rows come straight from the database, so skip re-validating them; response_model
+    # above only documents the schema since a Response is returned as-is
+    body = _TRADE_LIST_ADAPTER.dump_json([TradeResponse.model_construct(**row) for row in rows])
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("/{trade_id}", response_model=TradeResponse)
@@ -65,48 +144,45 @@ async def get_trade(
     db: AsyncSession = Depends(get_db),
 ):
     """Get a specific trade by ID"""
-    result = await db.execute(
-        select(Trade).where(Trade.id == trade_id)
-    )
-    trade = result.scalar_one_or_none()
+    # Primary-key lookup: checks the session's identity map before issuing a query
+    trade = await db.get(Trade, trade_id)
     
     if not trade:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Trade not found")
     
     return trade
 
 
 @router.get("/stats/summary")
+@cached_response(TRADE_STATS_CACHE_KEY)
 async def get_trade_stats(
     db: AsyncSession = Depends(get_db),
 ):
     """Get trade statistics"""
-    from sqlalchemy import func
-    
-    # Total trades
-    total_result = await db.execute(select(func.count(Trade.id)))
-    total_trades = total_result.scalar()
-    
-    # By status
-    status_result = await db.execute(
-        select(Trade.status, func.count(Trade.id))
-        .group_by(Trade.status)
-    )
-    status_dist = {row[0]: row[1] for row in status_result.all()}
-    
-    # By side
-    side_result = await db.execute(
-        select(Trade.side, func.count(Trade.id))
-        .group_by(Trade.side)
+    # One round trip: a row per status plus a row per side. grouping(status) is 1 on the
+    # side rows, where status is rolled up; totals are the sums over the status rows.
+    result = await db.execute(
+        select(
+            func.grouping(Trade.status),
+            Trade.status,
+            Trade.side,
+            func.count(Trade.id),
+            func.sum(Trade.quantity * Trade.price),
+        )
+        .group_by(func.grouping_sets(tuple_(Trade.status), tuple_(Trade.side)))
     )
-    side_dist = {row[0]: row[1] for row in side_result.all()}
     
-    # Total volume
-    volume_result = await db.execute(
-        select(func.sum(Trade.quantity * Trade.price))
-    )
-    total_volume = volume_result.scalar() or 0
+    status_dist = {}
+    side_dist = {}
+    total_trades = 0
+    total_volume = 0
+    for status_rolled_up, status, side, count, volume in result.all():
+        if status_rolled_up:
+            side_dist[side] = count
+        else:
+            status_dist[status] = count
+            total_trades += count
+            total_volume += volume or 0
     
     return {
         "total_trades": total_trades,
@@ -128,11 +204,14 @@ class TradeRequest(BaseModel):
 async def execute_trade(
     trade_request: TradeRequest,
     db: AsyncSession = Depends(get_db),
+    trading_service: TradingService = Depends(get_trading_service),
 ):
     """Execute a trade based on sentiment analysis"""
-    trading_service = TradingService()
-    
     try:
+        # Checked before any order is placed: the trade row's foreign key would reject it afterwards
+        if trade_request.tweet_id is not None and await db.get(Tweet, trade_request.tweet_id) is None:
+            raise HTTPException(status_code=404, detail="Tweet not found")
+        
         trade = await trading_service.execute_trade(
             session=db,
             symbol=trade_request.symbol,
@@ -147,6 +226,7 @@ async def execute_trade(
                 detail="Trade execution failed. Check if trading is enabled and sentiment is strong enough."
             )
         
+        await cache_delete(TRADE_STATS_CACHE_KEY)
         return trade
     except HTTPException:
         raise
@@ -2,49 +2,29 @@
 Tweet Endpoints
 """
 
-from fastapi import APIRouter, Depends, Query, HTTPException
+import asyncio
+
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import Select, bindparam, select, desc, func, tuple_
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from datetime import datetime
 
+from app.api.deps import get_twitter_service, get_reddit_service, get_sentiment_service
+from app.core.config import settings
 from app.db.database import get_db
 from app.db.models import Tweet
+from app.services.response_cache import cache_delete, cached_response
 from app.services.twitter_service import TwitterService
 from app.services.reddit_service import RedditService
 from app.services.sentiment_service import SentimentService
+from app.utils.pagination import STREAM_MIN_ROWS, encode_cursor, decode_cursor, stream_json_rows
 
 router = APIRouter()
 
-# Global service instances (initialized on first use)
-_twitter_service: Optional[TwitterService] = None
-_reddit_service: Optional[RedditService] = None
-_sentiment_service: Optional[SentimentService] = None
-
-
-def get_twitter_service() -> TwitterService:
-    """Get or create TwitterService instance"""
-    global _twitter_service
-    if _twitter_service is None:
-        _twitter_service = TwitterService()
-    return _twitter_service
-
-
-def get_reddit_service() -> RedditService:
-    """Get or create RedditService instance"""
-    global _reddit_service
-    if _reddit_service is None:
-        _reddit_service = RedditService()
-    return _reddit_service
-
-
-def get_sentiment_service() -> SentimentService:
-    """Get or create SentimentService instance"""
-    global _sentiment_service
-    if _sentiment_service is None:
-        _sentiment_service = SentimentService()
-    return _sentiment_service
+TWEET_STATS_CACHE_KEY = "tweets:stats"
 
 
 class TweetResponse(BaseModel):
@@ -63,29 +43,120 @@ class TweetResponse(BaseModel):
         from_attributes = True
 
 
+# Columns backing TweetResponse, selected directly so list rows skip ORM materialization
+_TWEET_COLUMNS = tuple(Tweet.__table__.c[name] for name in TweetResponse.model_fields)
+
+# Serializes whole list pages in pydantic-core instead of per-item response_model handling
+_TWEET_LIST_ADAPTER = TypeAdapter(List[TweetResponse])
+
+
+def _tweets_query(has_author: bool, has_sentiment: bool, has_cursor: bool) -> Select:
+    """List query for one combination of filters; filter values are bound at execution"""
+    query = select(*_TWEET_COLUMNS).order_by(desc(Tweet.created_at_db), desc(Tweet.id))
+    if has_author:
+        query = query.where(Tweet.author_username == bindparam("author"))
+    if has_sentiment:
+        query = query.where(Tweet.sentiment_label == bindparam("sentiment"))
+    if has_cursor:
+        # Seek past the previous page instead of scanning and discarding OFFSET rows
+        query = query.where(
+            tuple_(Tweet.created_at_db, Tweet.id) < tuple_(
+                bindparam("cursor_created_at", type_=Tweet.created_at_db.type),
+                bindparam("cursor_id", type_=Tweet.id.type),
+            )
+        )
+    return query
+
+
+# Lookup by tweet_id, built once and reused with a new bound parameter per call
+_TWEET_BY_TWEET_ID = select(*_TWEET_COLUMNS).where(Tweet.tweet_id == bindparam("tweet_id"))
+
+
+# Every filter shape is built once at import, so requests only bind values and add OFFSET/LIMIT
+_TWEET_QUERIES = {
+    (has_author, has_sentiment, has_cursor): _tweets_query(has_author, has_sentiment, has_cursor)
+    for has_author in (False, True)
+    for has_sentiment in (False, True)
+    for has_cursor in (False, True)
+}
+
+
+def _tweet_response(tweet: Tweet) -> TweetResponse:
+    """Build a TweetResponse from a loaded Tweet without re-validating database values"""
+    return TweetResponse.model_construct(**{name: getattr(tweet, name) for name in TweetResponse.model_fields})
+
+
 @router.get("/", response_model=List[TweetResponse])
 async def get_tweets(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
     author: Optional[str] = None,
     sentiment: Optional[str] = Query(None, regex="^(positive|negative|neutral)$"),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get tweets with optional filtering"""
-    query = select(Tweet).order_by(desc(Tweet.created_at_db))
-    
+    """
+    Get tweets with optional filtering
+    Full pages carry an X-Next-Cursor header; pass it back as `cursor` for the next page
+    """
+    params = {}
     if author:
-        query = query.where(Tweet.author_username == author)
-    
+        params["author"] = author
     if sentiment:
-        query = query.where(Tweet.sentiment_label == sentiment)
+        params["sentiment"] = sentiment
+    if cursor:
+        try:
+            params["cursor_created_at"], params["cursor_id"] = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    query = _TWEET_QUERIES[bool(author), bool(sentiment), bool(cursor)]
+    if not cursor:
+        query = query.offset(skip)
+    
+    if limit >= STREAM_MIN_ROWS:
+        # Find the page's last row first (an index-only probe) so X-Next-Cursor can be
+        # sent ahead of the streamed body
+        result = await db.execute(
+            query.with_only_columns(Tweet.created_at_db, Tweet.id).offset((0 if cursor else skip) + limit - 1).limit(1),
+            params,
+        )
+        boundary = result.first()
+        headers = {}
+        if boundary is None:
+            query = query.limit(limit)
+        else:
+            headers["X-Next-Cursor"] = encode_cursor(*boundary)
+            # End the page at the boundary row instead of LIMIT, so rows inserted between
+            # the two queries can't push unseen rows past the cursor
+            query = query.where(tuple_(Tweet.created_at_db, Tweet.id) >= tuple_(*boundary))
+        return StreamingResponse(
+            stream_json_rows(query, params, TweetResponse, _TWEET_LIST_ADAPTER),
+            media_type="application/json",
+            headers=headers,
+        )
     
-    query = query.offset(skip).limit(limit)
+    result = await db.execute(query.limit(limit), params)
+    rows = result.mappings().all()
     
-    result = await db.execute(query)
-    tweets = result.scalars().all()
+    headers = {}
+    if len(rows) == limit:
+        last = rows[-1]
+        headers["X-Next-Cursor"] = encode_cursor(last["created_at_db"], last["id"])
     
-    return tweets
+    # Rows come straight from the database, so skip re-validating them; response_model
+    # above only documents the schema since a Response is returned as-is
+    body = _TWEET_LIST_ADAPTER.dump_json([TweetResponse.model_construct(**row) for row in rows])
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _discard(task: Optional[asyncio.Task]):
+    """Cancel a speculative task whose result is no longer needed"""
+    if task is None:
+        return
+    task.cancel()
+    # Retrieve the outcome so a task that already failed doesn't log "exception was never retrieved"
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
 
 
 class FetchTweetsRequest(BaseModel):
@@ -132,7 +203,19 @@ async def fetch_tweets_from_twitter(
         
         # Step 2: Get user ID
         status_messages.append(f"Looking up user ID for @{username}...")
-        user_id, error_type = await twitter_service.get_user_id(username)
+        reddit_task = None
+        if settings.REDDIT_SPECULATIVE_FALLBACK:
+            # Overlap the Reddit fallback with the lookup so a rate-limited lookup doesn't pay for it serially
+            reddit_task = asyncio.ensure_future(
+                reddit_service.get_posts_for_username(username, request.max_results)
+            )
+        try:
+            user_id, error_type = await twitter_service.get_user_id(username)
+        except BaseException:
+            _discard(reddit_task)
+            raise
+        if error_type != 'rate_limit':
+            _discard(reddit_task)
         
         if not user_id:
             # Provide specific error messages based on error type
@@ -156,59 +239,31 @@ async def fetch_tweets_from_twitter(
                 status_messages.append("⚠️ Twitter API rate limit exceeded")
                 status_messages.append("Switching to Reddit API (free alternative)...")
                 
-                # Try Reddit as a free fallback
-                reddit_service = get_reddit_service()
+                # Try Reddit as a free fallback (already in flight when speculative fallback is enabled)
                 status_messages.append(f"Fetching Reddit posts related to @{username}...")
                 
                 try:
-                    reddit_posts = await reddit_service.get_posts_for_username(username, request.max_results)
+                    if reddit_task is not None:
+                        reddit_posts = await reddit_task
+                    else:
+                        reddit_posts = await reddit_service.get_posts_for_username(username, request.max_results)
                     
                     if reddit_posts:
                         status_messages.append(f"✅ Found {len(reddit_posts)} Reddit posts")
                         status_messages.append("Saving Reddit posts to database...")
                         
-                        # Convert Reddit posts to tweet format and save
-                        for idx, post_data in enumerate(reddit_posts, 1):
-                            try:
-                                status_messages.append(f"Processing Reddit post {idx}/{len(reddit_posts)}...")
-                                
-                                # Check if post already exists
-                                result = await db.execute(
-                                    select(Tweet).where(Tweet.tweet_id == post_data["tweet_id"])
-                                )
-                                existing_tweet = result.scalar_one_or_none()
-                                
-                                if existing_tweet:
-                                    tweets_skipped += 1
-                                    saved_tweets.append(TweetResponse(
-                                        id=existing_tweet.id,
-                                        tweet_id=existing_tweet.tweet_id,
-                                        author_username=existing_tweet.author_username,
-                                        content=existing_tweet.content,
-                                        created_at=existing_tweet.created_at,
-                                        sentiment_score=existing_tweet.sentiment_score,
-                                        sentiment_label=existing_tweet.sentiment_label,
-                                        processed=existing_tweet.processed,
-                                        created_at_db=existing_tweet.created_at_db,
-                                    ))
-                                else:
-                                    # Save new post (sentiment analysis will be done later via analyze endpoint)
-                                    tweet = await twitter_service.save_tweet(db, post_data)
-                                    tweets_saved += 1
-                                    tweets_fetched += 1
-                                    saved_tweets.append(TweetResponse(
-                                        id=tweet.id,
-                                        tweet_id=tweet.tweet_id,
-                                        author_username=tweet.author_username,
-                                        content=tweet.content,
-                                        created_at=tweet.created_at,
-                                        sentiment_score=tweet.sentiment_score,
-                                        sentiment_label=tweet.sentiment_label,
-                                        processed=tweet.processed,
-                                        created_at_db=tweet.created_at_db,
-                                    ))
-                            except Exception as e:
-                                status_messages.append(f"Error processing Reddit post {idx}: {str(e)}")
+                        # Save new posts in one batch (sentiment analysis will be done later via analyze endpoint)
+                        try:
+                            rows, inserted_ids = await twitter_service.save_tweets(
+                                db, [post.as_tweet_data() for post in reddit_posts]
+                            )
+                            if inserted_ids:
+                                await cache_delete(TWEET_STATS_CACHE_KEY)
+                            tweets_saved = tweets_fetched = len(inserted_ids)
+                            tweets_skipped = len(rows) - tweets_saved
+                            saved_tweets = [TweetResponse.model_construct(**row) for row in rows]
+                        except Exception as e:
+                            status_messages.append(f"Error saving Reddit posts: {str(e)}")
                         
                         status_messages.append("✅ Reddit posts fetched and saved successfully!")
                         
@@ -324,49 +379,21 @@ async def fetch_tweets_from_twitter(
         # Step 4: Save tweets to database
         status_messages.append("Saving tweets to database...")
         
-        for idx, tweet_data in enumerate(tweet_data_list, 1):
-            try:
-                status_messages.append(f"Processing tweet {idx}/{tweets_fetched}...")
-                
-                # Check if tweet already exists
-                result = await db.execute(
-                    select(Tweet).where(Tweet.tweet_id == tweet_data["tweet_id"])
-                )
-                existing_tweet = result.scalar_one_or_none()
-                
-                if existing_tweet:
-                    tweets_skipped += 1
-                    status_messages.append(f"Tweet {idx} already exists in database, skipping...")
-                    saved_tweets.append(TweetResponse(
-                        id=existing_tweet.id,
-                        tweet_id=existing_tweet.tweet_id,
-                        author_username=existing_tweet.author_username,
-                        content=existing_tweet.content,
-                        created_at=existing_tweet.created_at,
-                        sentiment_score=existing_tweet.sentiment_score,
-                        sentiment_label=existing_tweet.sentiment_label,
-                        processed=existing_tweet.processed,
-                        created_at_db=existing_tweet.created_at_db,
-                    ))
-                else:
-                    # Save new tweet (sentiment analysis will be done later via analyze endpoint)
-                    tweet = await twitter_service.save_tweet(db, tweet_data)
+        # Save new tweets in one batch (sentiment analysis will be done later via analyze endpoint)
+        try:
+            rows, inserted_ids = await twitter_service.save_tweets(db, tweet_data_list)
+            if inserted_ids:
+                await cache_delete(TWEET_STATS_CACHE_KEY)
+            for idx, row in enumerate(rows, 1):
+                if row["tweet_id"] in inserted_ids:
                     tweets_saved += 1
                     status_messages.append(f"Tweet {idx} saved successfully")
-                    saved_tweets.append(TweetResponse(
-                        id=tweet.id,
-                        tweet_id=tweet.tweet_id,
-                        author_username=tweet.author_username,
-                        content=tweet.content,
-                        created_at=tweet.created_at,
-                        sentiment_score=tweet.sentiment_score,
-                        sentiment_label=tweet.sentiment_label,
-                        processed=tweet.processed,
-                        created_at_db=tweet.created_at_db,
-                    ))
-            except Exception as e:
-                status_messages.append(f"Error processing tweet {idx}: {str(e)}")
-                # Continue with next tweet
+                else:
+                    tweets_skipped += 1
+                    status_messages.append(f"Tweet {idx} already exists in database, skipping...")
+                saved_tweets.append(TweetResponse.model_construct(**row))
+        except Exception as e:
+            status_messages.append(f"Error saving tweets: {str(e)}")
         
         status_messages.append("✅ Tweet fetching and saving completed!")
         
@@ -413,42 +440,30 @@ async def analyze_tweets(
     Analyze sentiment for specified tweets.
     Updates tweets in the database with sentiment scores and labels.
     """
-    analyzed_count = 0
-    updated_tweets = []
-    
     try:
-        for tweet_id in request.tweet_ids:
-            # Get tweet from database
-            result = await db.execute(
-                select(Tweet).where(Tweet.id == tweet_id)
+        # Load every requested tweet in one query, keeping the request order
+        result = await db.execute(
+            select(Tweet).where(Tweet.id.in_(request.tweet_ids))
+        )
+        tweets_by_id = {tweet.id: tweet for tweet in result.scalars().all()}
+        tweets = [tweets_by_id[tweet_id] for tweet_id in dict.fromkeys(request.tweet_ids) if tweet_id in tweets_by_id]
+        
+        if tweets:
+            # One batched model pass, run off the event loop
+            sentiments = await asyncio.to_thread(
+                sentiment_service.analyze_batch, [tweet.content for tweet in tweets]
             )
-            tweet = result.scalar_one_or_none()
-            
-            if not tweet:
-                continue
-            
-            # Analyze sentiment
-            sentiment = sentiment_service.analyze(tweet.content)
             
-            # Update tweet with sentiment analysis
-            tweet.sentiment_score = sentiment["score"]
-            tweet.sentiment_label = sentiment["label"]
+            # Update tweets with sentiment analysis
+            for tweet, sentiment in zip(tweets, sentiments):
+                tweet.sentiment_score = sentiment["score"]
+                tweet.sentiment_label = sentiment["label"]
             
             await db.commit()
-            await db.refresh(tweet)
-            
-            analyzed_count += 1
-            updated_tweets.append(TweetResponse(
-                id=tweet.id,
-                tweet_id=tweet.tweet_id,
-                author_username=tweet.author_username,
-                content=tweet.content,
-                created_at=tweet.created_at,
-                sentiment_score=tweet.sentiment_score,
-                sentiment_label=tweet.sentiment_label,
-                processed=tweet.processed,
-                created_at_db=tweet.created_at_db,
-            ))
+            await cache_delete(TWEET_STATS_CACHE_KEY)
+        
+        analyzed_count = len(tweets)
+        updated_tweets = [_tweet_response(tweet) for tweet in tweets]
         
         return AnalyzeTweetsResponse(
             success=True,
@@ -465,29 +480,32 @@ async def analyze_tweets(
 
 
 @router.get("/stats/summary")
+@cached_response(TWEET_STATS_CACHE_KEY)
 async def get_tweet_stats(
     db: AsyncSession = Depends(get_db),
 ):
     """Get tweet statistics"""
-    from sqlalchemy import func
-    
-    # Total tweets
-    total_result = await db.execute(select(func.count(Tweet.id)))
-    total_tweets = total_result.scalar()
-    
-    # Sentiment distribution
-    sentiment_result = await db.execute(
-        select(Tweet.sentiment_label, func.count(Tweet.id))
-        .group_by(Tweet.sentiment_label)
+    # One round trip: a row per sentiment label plus a row per author. sentiment_label can
+    # itself be NULL, so grouping() tells the rolled-up author rows apart.
+    result = await db.execute(
+        select(
+            func.grouping(Tweet.sentiment_label),
+            Tweet.sentiment_label,
+            Tweet.author_username,
+            func.count(Tweet.id),
+        )
+        .group_by(func.grouping_sets(tuple_(Tweet.sentiment_label), tuple_(Tweet.author_username)))
     )
-    sentiment_dist = {row[0] or "unknown": row[1] for row in sentiment_result.all()}
     
-    # By author
-    author_result = await db.execute(
-        select(Tweet.author_username, func.count(Tweet.id))
-        .group_by(Tweet.author_username)
-    )
-    author_dist = {row[0]: row[1] for row in author_result.all()}
+    sentiment_dist = {}
+    author_dist = {}
+    total_tweets = 0
+    for sentiment_rolled_up, label, author, count in result.all():
+        if sentiment_rolled_up:
+            author_dist[author] = count
+        else:
+            sentiment_dist[label or "unknown"] = count
+            total_tweets += count
     
     return {
         "total_tweets": total_tweets,
@@ -502,13 +520,13 @@ async def get_tweet(
     db: AsyncSession = Depends(get_db),
 ):
     """Get a specific tweet by ID"""
-    result = await db.execute(
-        select(Tweet).where(Tweet.tweet_id == tweet_id)
-    )
-    tweet = result.scalar_one_or_none()
+    # tweet_id is unique but not the primary key, so session.get() doesn't apply;
+    # select the response columns and skip ORM materialization instead
+    result = await db.execute(_TWEET_BY_TWEET_ID, {"tweet_id": tweet_id})
+    row = result.mappings().one_or_none()
     
-    if not tweet:
+    if row is None:
         raise HTTPException(status_code=404, detail="Tweet not found")
     
-    return tweet
+    return TweetResponse.model_construct(**row)
 
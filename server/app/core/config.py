@@ -5,7 +5,7 @@ Loads settings from environment variables with sensible defaults
 
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
-from typing import List, Union
+from typing import Tuple, Union
 import os
 from functools import lru_cache
 
@@ -18,12 +18,24 @@ class Settings(BaseSettings):
     PORT: int = 8000
     DEBUG: bool = False
     ENVIRONMENT: str = "production"
+    WORKERS: int = 1  # uvicorn worker processes for `python main.py` (ignored with DEBUG reload)
+    ACCESS_LOG: bool = False  # per-request uvicorn access log lines
     
     # CORS settings
-    CORS_ORIGINS: Union[str, List[str]] = "http://localhost:3000,http://localhost:5173"
+    CORS_ORIGINS: Union[str, Tuple[str, ...]] = "http://localhost:3000,http://localhost:5173"
     
     # Database settings
     DATABASE_URL: str = "postgresql+asyncpg://localhost/tradex"
+    DB_USE_PGBOUNCER: bool = False  # DATABASE_URL points at PgBouncer (pool_mode = transaction)
+    DB_POOL_SIZE: int = 20  # persistent connections per process (ignored behind PgBouncer)
+    DB_MAX_OVERFLOW: int = 10  # extra connections allowed under burst load
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection before failing
+    DB_POOL_RECYCLE: int = 600  # seconds before a connection is replaced (stay under server/LB idle timeouts)
+    SQL_ECHO: bool = False  # log every SQL statement (slow; independent of DEBUG)
+    
+    # Response cache (optional Redis; falls back to per-process memory)
+    REDIS_URL: str = ""  # e.g. redis://localhost:6379/0; unset, stats may be stale up to STATS_CACHE_TTL with WORKERS > 1
+    STATS_CACHE_TTL: int = 30  # seconds /stats/summary responses are served from cache
     
     # Twitter API settings
     TWITTER_BEARER_TOKEN: str = ""
@@ -46,10 +58,14 @@ class Settings(BaseSettings):
     TRADING_ENABLED: bool = False  # Safety: disabled by default
     MAX_POSITION_SIZE: float = 1000.0  # Maximum position size in dollars
     RISK_PERCENTAGE: float = 1.0  # Risk 1% of capital per trade
+    POSITION_SYNC_INTERVAL: int = 5  # seconds between background position syncs
     
     # Sentiment analysis settings
     SENTIMENT_THRESHOLD_POSITIVE: float = 0.3
     SENTIMENT_THRESHOLD_NEGATIVE: float = -0.3
+    SENTIMENT_NEUTRAL_GATE: float = 0.0  # short texts with |VADER compound| below this skip the transformer (0 disables)
+    SENTIMENT_ONNX_INT8: bool = False  # run the transformer INT8-quantized on ONNX Runtime (needs optimum[onnxruntime])
+    SENTIMENT_ONNX_DIR: str = "models/sentiment-int8"  # where the quantized model is written on first start
     
     # Monitoring settings
     # Note: With 100 posts/month limit, recommended settings:
@@ -57,9 +73,12 @@ class Settings(BaseSettings):
     # - TWEETS_PER_USER: 1
     # - MONITORED_USERS: 1-2 users max
     # Example: 2 users × 1 tweet × 4 checks/day = 8 posts/day = ~240/month (still over, adjust as needed)
-    MONITORED_USERS: Union[str, List[str]] = "elonmusk,Tesla,realDonaldTrump"
+    MONITORED_USERS: Union[str, Tuple[str, ...]] = "elonmusk,Tesla,realDonaldTrump"
     TWEET_CHECK_INTERVAL: int = 21600  # seconds (6 hours default to conserve API quota - 100 posts/month limit)
     TWEETS_PER_USER: int = 1  # Number of tweets to fetch per user per check (1 = most conservative)
+    TWITTER_MAX_CONCURRENCY: int = 10  # monitored users whose timelines are fetched at the same time
+    TWITTER_SEARCH_BATCH_SIZE: int = 0  # >1: one search/recent request per this many monitored users instead of a timeline each (last 7 days only)
+    REDDIT_SPECULATIVE_FALLBACK: bool = False  # /tweets/fetch starts the Reddit fallback alongside the Twitter lookup (uses Reddit quota on every call)
     
     # Logging
     LOG_LEVEL: str = "INFO"
@@ -68,23 +87,24 @@ class Settings(BaseSettings):
     @field_validator("CORS_ORIGINS", mode="before")
     @classmethod
     def parse_cors_origins(cls, v):
-        """Parse comma-separated CORS origins"""
+        """Parse comma-separated CORS origins (parsed once into an immutable tuple)"""
         if isinstance(v, str):
-            return [origin.strip() for origin in v.split(",")]
-        return v
+            return tuple(origin.strip() for origin in v.split(","))
+        return tuple(v)
     
     @field_validator("MONITORED_USERS", mode="before")
     @classmethod
     def parse_monitored_users(cls, v):
-        """Parse comma-separated monitored users"""
+        """Parse comma-separated monitored users (parsed once into an immutable tuple)"""
         if isinstance(v, str):
-            return [user.strip() for user in v.split(",")]
-        return v
+            return tuple(user.strip() for user in v.split(","))
+        return tuple(v)
     
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
         case_sensitive = True
+        frozen = True  # settings are read-only after startup
 
 
 @lru_cache()
@@ -13,11 +13,26 @@ class TwitterAPIError(TradeXException):
     pass
 
 
+class TwitterRateLimitError(TwitterAPIError):
+    """Twitter API rate limit window exhausted"""
+    pass
+
+
 class TradingAPIError(TradeXException):
     """Trading API related errors"""
     pass
 
 
+class YfRateLimitedError(TradeXException):
+    """Yahoo rejected a yfinance call with a rate limit"""
+    pass
+
+
+class YfNotFoundError(TradeXException):
+    """yfinance has no data for the symbol"""
+    pass
+
+
 class SentimentAnalysisError(TradeXException):
     """Sentiment analysis related errors"""
     pass
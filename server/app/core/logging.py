@@ -3,12 +3,18 @@ Logging Configuration
 Production-ready logging setup with file and console handlers
 """
 
+import atexit
 import logging
+import queue
 import sys
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from typing import Iterable, Optional
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from app.core.config import settings
 
+# Background thread that writes queued records to the console and log file
+_listener: Optional[QueueListener] = None
+
 
 def setup_logging() -> logging.Logger:
     """Setup application logging"""
@@ -35,7 +41,6 @@ def setup_logging() -> logging.Logger:
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
     
     # File handler with rotation
     file_handler = RotatingFileHandler(
@@ -45,7 +50,40 @@ def setup_logging() -> logging.Logger:
     )
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    
+    # Callers (including the event loop) only enqueue records; the stdout and disk
+    # writes happen on the listener thread
+    global _listener
+    log_queue = queue.Queue(-1)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.propagate = False
+    _listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
     
     return logger
 
+
+def shutdown_logging():
+    """Flush queued log records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+
+class HealthCheckAccessFilter(logging.Filter):
+    """Drop uvicorn access-log records for health probe paths"""
+    
+    def __init__(self, paths: Iterable[str]):
+        super().__init__()
+        self.paths = frozenset(paths)
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        # uvicorn.access args: (client_addr, method, full_path, http_version, status_code)
+        args = record.args
+        if isinstance(args, tuple) and len(args) >= 3:
+            path = str(args[2]).split("?", 1)[0]
+            return path not in self.paths
+        return True
@@ -2,18 +2,61 @@
 Database Configuration and Connection
 """
 
+from uuid import uuid4
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import NullPool
 from app.core.config import settings
 from app.core.logging import setup_logging
 
 logger = setup_logging()
 
+# Driver-specific connection arguments
+connect_args = {}
+if settings.DATABASE_URL.startswith("postgresql+asyncpg"):
+    if settings.DB_USE_PGBOUNCER:
+        connect_args = {
+            # Transaction pooling hands each transaction an arbitrary backend, so
+            # prepared statements cannot be cached on the client side
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            # SQLAlchemy still prepares each statement under a name; asyncpg's default
+            # __asyncpg_stmt_N__ numbering restarts per connection and collides on shared backends
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    else:
+        connect_args = {
+            # Keep prepared statements per connection to skip re-parsing and type introspection
+            "statement_cache_size": 1024,
+            # PostgreSQL JIT adds planning overhead to short OLTP queries
+            "server_settings": {"jit": "off"},
+        }
+
+if settings.DB_USE_PGBOUNCER or settings.ENVIRONMENT == "test":
+    # PgBouncer does the pooling; a backend is only held while a transaction runs.
+    # Test runs also get a fresh connection per session so a leaked session can't exhaust a pool.
+    pool_args = {"poolclass": NullPool}
+else:
+    pool_args = {
+        # Size the pool for concurrent requests plus background sync/monitoring tasks
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        # Reuse the most recently returned (warm) connection
+        "pool_use_lifo": True,
+        # Replace connections that died while idle (DB, PgBouncer or load balancer restart)
+        # before they reach endpoints and background tasks
+        "pool_pre_ping": True,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
 # Database engine
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=settings.DEBUG,
+    echo=settings.SQL_ECHO,
     future=True,
+    connect_args=connect_args,
+    **pool_args,
 )
 
 # Session factory
@@ -32,6 +75,8 @@ async def init_db():
     from app.db import models  # Import models to register them
     
     async with engine.begin() as conn:
+        # Creates missing tables with their indexes; existing tables are left as they are
+        # (new indexes on them are added with CREATE INDEX CONCURRENTLY, see postgresql-setup.md)
         await conn.run_sync(Base.metadata.create_all)
     
     logger.info("Database initialized")
@@ -50,4 +95,3 @@ async def get_db() -> AsyncSession:
             yield session
         finally:
             await session.close()
-
@@ -2,7 +2,8 @@
 Database Models
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime, Boolean, Text, Index, ForeignKey
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
 
@@ -21,6 +22,23 @@ class Tweet(Base):
     sentiment_label = Column(String, nullable=True)  # positive, negative, neutral
     processed = Column(Boolean, default=False)
     created_at_db = Column(DateTime, server_default=func.now())
+    
+    # Never loaded implicitly: opt in with selectinload(Tweet.trades) to avoid N+1 queries
+    trades = relationship("Trade", back_populates="tweet", lazy="raise")
+
+
+# Keyset pagination index for the tweet list (ORDER BY created_at_db DESC, id DESC)
+Index("ix_tweets_created_at_db_id", Tweet.created_at_db.desc(), Tweet.id.desc())
+
+# Tweet list filtered by author: rows come out in page order, and the sentiment filter
+# is checked from the index without visiting the heap
+Index(
+    "ix_tweets_author_created_at_db_id",
+    Tweet.author_username,
+    Tweet.created_at_db.desc(),
+    Tweet.id.desc(),
+    postgresql_include=["sentiment_label"],
+)
 
 
 class Trade(Base):
@@ -35,10 +53,44 @@ class Trade(Base):
     price = Column(Float, nullable=False)
     order_id = Column(String, unique=True, nullable=True)
     status = Column(String, nullable=False)  # pending, filled, cancelled, rejected
-    tweet_id = Column(Integer, nullable=True)  # Reference to Tweet
+    tweet_id = Column(Integer, ForeignKey("tweets.id", ondelete="SET NULL"), index=True, nullable=True)
     sentiment_score = Column(Float, nullable=True)
     reason = Column(Text, nullable=True)
     created_at = Column(DateTime, server_default=func.now())
+    
+    # Never loaded implicitly: opt in with selectinload(Trade.tweet), which resolves all
+    # tweets of a result in one IN query
+    tweet = relationship("Tweet", back_populates="trades", lazy="raise")
+    
+    # Server-generated created_at is fetched by the INSERT itself (RETURNING), not a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
+
+# Keyset pagination index for the trade list (ORDER BY created_at DESC, id DESC)
+Index("ix_trades_created_at_id", Trade.created_at.desc(), Trade.id.desc())
+
+# Trade list filtered by symbol (and optionally status) without a sort step
+Index(
+    "ix_trades_symbol_status_created_at_id",
+    Trade.symbol,
+    Trade.status,
+    Trade.created_at.desc(),
+    Trade.id.desc(),
+)
+
+# Trade list filtered by status alone (e.g. pending orders across all symbols)
+Index("ix_trades_status_created_at_id", Trade.status, Trade.created_at.desc(), Trade.id.desc())
+
+
+class TwitterUser(Base):
+    """Resolved Twitter username -> user ID, so restarts don't repeat the lookups"""
+    
+    __tablename__ = "twitter_users"
+    
+    username = Column(String, primary_key=True)  # lowercase, without @
+    user_id = Column(BigInteger, nullable=False)
+    fetched_at = Column(DateTime, nullable=False)
+    last_tweet_id = Column(BigInteger, nullable=True)  # newest tweet stored by the monitor (since_id)
 
 
 class Position(Base):
@@ -0,0 +1,51 @@
+"""
+Shared HTTP Clients
+One pooled httpx.AsyncClient reused by all outbound provider requests
+"""
+
+import logging
+from typing import Optional
+
+import httpx
+
+from app.core.logging import setup_logging
+
+logger = setup_logging()
+
+# httpx logs every request at INFO; keep only its warnings and errors
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+HTTP_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=40,
+    keepalive_expiry=30.0,
+)
+HTTP_TIMEOUT = httpx.Timeout(connect=3.0, read=10.0, write=5.0, pool=5.0)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def init_http_client() -> httpx.AsyncClient:
+    """Create the shared client (called once at application startup)"""
+    global _client
+    if _client is None or _client.is_closed:
+        # HTTP/2 multiplexes concurrent requests to the same provider over one socket
+        _client = httpx.AsyncClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT, http2=True)
+        logger.info("Shared HTTP client initialized")
+    return _client
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it if startup has not run (e.g. scripts)"""
+    if _client is None or _client.is_closed:
+        return init_http_client()
+    return _client
+
+
+async def close_http_client():
+    """Close the shared client and its connection pool"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("Shared HTTP client closed")
@@ -4,13 +4,86 @@ Free alternative to Twitter API for fetching social media content
 Uses Reddit's public API (no authentication required)
 """
 
+import asyncio
+import math
+import time
 import aiohttp
-from typing import List, Dict, Optional
+import orjson
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, List, Dict, Optional, Tuple
 from datetime import datetime, timezone
 from app.core.logging import setup_logging
+from app.utils.rate_limiter import AsyncTokenBucket
 
 logger = setup_logging()
 
+# Longest Retry-After honoured before retrying a rate-limited request (seconds)
+MAX_RETRY_AFTER = 60.0
+
+
+def _retry_after_seconds(value: Optional[str]) -> float:
+    """Parse a Retry-After header (delta-seconds form), defaulting to one second"""
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        return 1.0
+    # float() also accepts "nan" and "inf", which would slip past the cap
+    if not math.isfinite(seconds) or seconds < 0:
+        return 1.0
+    return min(seconds, MAX_RETRY_AFTER)
+
+
+@dataclass(frozen=True, slots=True)
+class RedditPost:
+    """A Reddit post in tweet-like form; frozen so cached listings can be shared between callers"""
+    tweet_id: str
+    author_username: str
+    title: str
+    selftext: str
+    created_at: datetime
+    subreddit: str
+    score: int
+    url: str
+    source: str = "reddit"
+    
+    @property
+    def content(self) -> str:
+        """Title and body as one text, built only when the post is stored or analyzed"""
+        return f"{self.title}\n\n{self.selftext}"
+    
+    def as_tweet_data(self) -> Dict[str, Any]:
+        """Fields expected by TwitterService.save_tweets"""
+        return {
+            "tweet_id": self.tweet_id,
+            "author_username": self.author_username,
+            "content": self.content,
+            "created_at": self.created_at,
+        }
+
+
+def _parse_listing(raw: bytes, subreddit: Optional[str] = None) -> List[RedditPost]:
+    """
+    Parse a Reddit listing response body into posts
+    subreddit overrides the per-post subreddit (listings of a single subreddit)
+    """
+    children = orjson.loads(raw).get("data", {}).get("children", ())
+    posts = []
+    for child in children:
+        post_data = child.get("data", {})
+        get = post_data.get
+        posts.append(RedditPost(
+            tweet_id=f"reddit_{get('id', '')}",
+            author_username=get("author", "unknown"),
+            title=get("title", ""),
+            selftext=get("selftext", ""),
+            created_at=datetime.fromtimestamp(get("created_utc", 0), tz=timezone.utc),
+            subreddit=subreddit or get("subreddit", ""),
+            score=get("score", 0),
+            url=f"https://reddit.com{get('permalink', '')}",
+        ))
+    return posts
+
 
 class RedditService:
     """Service for Reddit API interactions (free, no auth required)"""
@@ -23,99 +96,165 @@ class RedditService:
         "tesla": ["r/tesla", "r/teslainvestorsclub", "r/RealTesla"],
     }
     
+    HEADERS = {
+        "User-Agent": "TradeX/1.0 (Educational Project)"
+    }
+    
+    # Reddit allows about 60 requests per minute
+    REQUESTS_PER_SECOND = 1.0
+    REQUEST_BURST = 60
+    
+    # Subreddit listings are reused for this long (seconds)
+    CACHE_TTL = 30.0
+    MAX_CACHE_ENTRIES = 256
+    
     def __init__(self):
         """Initialize Reddit service"""
+        # Created on first use so the connector binds to the running event loop
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._bucket = AsyncTokenBucket(rate=self.REQUESTS_PER_SECOND, capacity=self.REQUEST_BURST)
+        # (subreddit, limit) -> (monotonic fetch time, posts); insertion order is age order
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[RedditPost]]] = {}
+        # (subreddit, limit) -> fetch in progress, shared by concurrent callers
+        self._inflight: Dict[Tuple[str, int], asyncio.Task] = {}
         logger.info("Reddit service initialized (free, no authentication required)")
     
-    async def get_posts_from_subreddit(self, subreddit: str, limit: int = 10) -> List[Dict]:
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, keeping connections to reddit.com alive between calls"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=20,
+                limit_per_host=10,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, headers=self.HEADERS)
+        return self._session
+    
+    @asynccontextmanager
+    async def _get(self, url: str, params: Optional[Dict] = None):
+        """
+        GET a Reddit URL, paced by the token bucket
+        A 429 is retried once after the server's Retry-After delay
+        """
+        session = await self._get_session()
+        await self._bucket.acquire()
+        response = await session.get(url, params=params)
+        if response.status == 429:
+            delay = _retry_after_seconds(response.headers.get("Retry-After"))
+            response.release()
+            logger.warning(f"Reddit rate limit hit, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            await self._bucket.acquire()
+            response = await session.get(url, params=params)
+        try:
+            yield response
+        finally:
+            response.release()
+    
+    async def close(self):
+        """Close the shared session and its connection pool"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def get_posts_from_subreddit(self, subreddit: str, limit: int = 10) -> List[RedditPost]:
         """
         Get recent posts from a subreddit
+        Listings are cached for CACHE_TTL seconds and concurrent callers share one request
         Args:
             subreddit: Subreddit name (with or without r/ prefix)
             limit: Number of posts to fetch (max 100)
         Returns:
-            List of post dictionaries
+            List of posts
         """
+        # Remove r/ prefix if present
+        key = (subreddit.lstrip("r/"), min(limit, 100))
+        
+        cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.CACHE_TTL:
+            return list(cached[1])
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_subreddit(*key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so a cancelled caller doesn't cancel the fetch other callers are waiting on
+        return list(await asyncio.shield(task))
+    
+    async def _fetch_subreddit(self, subreddit_clean: str, limit: int) -> List[RedditPost]:
+        """Fetch a subreddit listing and cache it on success"""
         try:
-            # Remove r/ prefix if present
-            subreddit_clean = subreddit.lstrip("r/")
-            url = f"{self.BASE_URL}/r/{subreddit_clean}/new.json?limit={min(limit, 100)}"
-            
-            headers = {
-                "User-Agent": "TradeX/1.0 (Educational Project)"
-            }
+            url = f"{self.BASE_URL}/r/{subreddit_clean}/new.json?limit={limit}"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        posts = []
-                        
-                        if "data" in data and "children" in data["data"]:
-                            for child in data["data"]["children"]:
-                                post_data = child.get("data", {})
-                                
-                                # Convert Reddit post to tweet-like format
-                                posts.append({
-                                    "tweet_id": f"reddit_{post_data.get('id', '')}",
-                                    "author_username": post_data.get("author", "unknown"),
-                                    "content": post_data.get("title", "") + "\n\n" + post_data.get("selftext", ""),
-                                    "created_at": datetime.fromtimestamp(
-                                        post_data.get("created_utc", 0),
-                                        tz=timezone.utc
-                                    ),
-                                    "source": "reddit",
-                                    "subreddit": subreddit_clean,
-                                    "score": post_data.get("score", 0),
-                                    "url": f"https://reddit.com{post_data.get('permalink', '')}",
-                                })
-                        
-                        logger.info(f"Fetched {len(posts)} posts from r/{subreddit_clean}")
-                        return posts
-                    else:
-                        logger.warning(f"Reddit API returned status {response.status} for r/{subreddit_clean}")
-                        return []
+            async with self._get(url) as response:
+                if response.status == 200:
+                    # Convert Reddit posts to tweet-like format
+                    posts = _parse_listing(await response.read(), subreddit_clean)
+                    logger.info(f"Fetched {len(posts)} posts from r/{subreddit_clean}")
+                    self._remember(subreddit_clean, limit, posts)
+                    return posts
+                else:
+                    logger.warning(f"Reddit API returned status {response.status} for r/{subreddit_clean}")
+                    return []
         except Exception as e:
-            logger.error(f"Error fetching posts from r/{subreddit}: {e}")
+            logger.error(f"Error fetching posts from r/{subreddit_clean}: {e}")
             return []
     
-    async def get_posts_for_username(self, username: str, limit: int = 10) -> List[Dict]:
+    def _remember(self, subreddit_clean: str, limit: int, posts: List[RedditPost]):
+        """Cache a listing, evicting the oldest entries beyond MAX_CACHE_ENTRIES"""
+        key = (subreddit_clean, limit)
+        self._cache.pop(key, None)
+        self._cache[key] = (time.monotonic(), posts)
+        while len(self._cache) > self.MAX_CACHE_ENTRIES:
+            del self._cache[next(iter(self._cache))]
+    
+    async def get_posts_for_username(self, username: str, limit: int = 10) -> List[RedditPost]:
         """
         Get posts related to a Twitter username by searching relevant subreddits
         Args:
             username: Twitter username (e.g., "elonmusk")
             limit: Number of posts per subreddit
         Returns:
-            List of post dictionaries
+            List of posts
         """
         all_posts = []
         
         # Get relevant subreddits for this username
         subreddits = self.USERNAME_TO_SUBREDDIT.get(username.lower(), [f"r/{username}"])
         
-        # Fetch from each subreddit
-        for subreddit in subreddits:
-            try:
-                posts = await self.get_posts_from_subreddit(subreddit, limit)
-                all_posts.extend(posts)
-            except Exception as e:
-                logger.warning(f"Failed to fetch from {subreddit}: {e}")
+        # Fetch all subreddits concurrently over the shared session
+        results = await asyncio.gather(
+            *(self.get_posts_from_subreddit(subreddit, limit) for subreddit in subreddits),
+            return_exceptions=True,
+        )
+        for subreddit, posts in zip(subreddits, results):
+            if isinstance(posts, BaseException):
+                logger.warning(f"Failed to fetch from {subreddit}: {posts}")
                 continue
+            all_posts.extend(posts)
         
         # Sort by creation date (newest first)
-        all_posts.sort(key=lambda x: x["created_at"], reverse=True)
+        all_posts.sort(key=lambda x: x.created_at, reverse=True)
         
         # Return top N posts
         return all_posts[:limit]
     
-    async def search_posts(self, query: str, limit: int = 10) -> List[Dict]:
+    async def search_posts(self, query: str, limit: int = 10) -> List[RedditPost]:
         """
         Search Reddit for posts matching a query
         Args:
             query: Search query
             limit: Number of results
         Returns:
-            List of post dictionaries
+            List of posts
         """
         try:
             url = f"{self.BASE_URL}/search.json"
@@ -125,37 +264,11 @@ class RedditService:
                 "sort": "new"
             }
             
-            headers = {
-                "User-Agent": "TradeX/1.0 (Educational Project)"
-            }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        posts = []
-                        
-                        if "data" in data and "children" in data["data"]:
-                            for child in data["data"]["children"]:
-                                post_data = child.get("data", {})
-                                
-                                posts.append({
-                                    "tweet_id": f"reddit_{post_data.get('id', '')}",
-                                    "author_username": post_data.get("author", "unknown"),
-                                    "content": post_data.get("title", "") + "\n\n" + post_data.get("selftext", ""),
-                                    "created_at": datetime.fromtimestamp(
-                                        post_data.get("created_utc", 0),
-                                        tz=timezone.utc
-                                    ),
-                                    "source": "reddit",
-                                    "subreddit": post_data.get("subreddit", ""),
-                                    "score": post_data.get("score", 0),
-                                    "url": f"https://reddit.com{post_data.get('permalink', '')}",
-                                })
-                        
-                        return posts
-                    else:
-                        return []
+            async with self._get(url, params=params) as response:
+                if response.status == 200:
+                    return _parse_listing(await response.read())
+                else:
+                    return []
         except Exception as e:
             logger.error(f"Error searching Reddit: {e}")
             return []
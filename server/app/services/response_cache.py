@@ -0,0 +1,115 @@
+"""
+Response Cache
+Short-lived cache for expensive read endpoints
+Uses Redis when REDIS_URL is set (shared by all workers), otherwise per-process memory
+"""
+
+import functools
+import time
+from typing import Dict, Optional, Tuple
+
+import orjson
+from fastapi import Response
+
+from app.core.config import settings
+from app.core.logging import setup_logging
+
+try:
+    import redis.asyncio as redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = setup_logging()
+
+_redis = None
+
+# key -> (monotonic expiry, encoded body) when Redis is not configured
+_local: Dict[str, Tuple[float, bytes]] = {}
+
+
+def init_response_cache():
+    """Connect to Redis if configured (called once at application startup)"""
+    global _redis
+    if not settings.REDIS_URL:
+        logger.info("Response cache: in-process (REDIS_URL not set)")
+        if settings.WORKERS > 1:
+            # cache_delete only reaches this process; the other workers expire on STATS_CACHE_TTL
+            logger.warning(
+                f"WORKERS={settings.WORKERS} without REDIS_URL: cached stats can be up to "
+                f"{settings.STATS_CACHE_TTL}s stale on other workers after a write"
+            )
+        return
+    if not REDIS_AVAILABLE:
+        logger.warning(
+            "REDIS_URL is set but the redis package is not installed "
+            "(pip install -r requirements-optional.txt); using in-process response cache"
+        )
+        return
+    _redis = redis.from_url(settings.REDIS_URL)
+    logger.info("Response cache: Redis")
+
+
+async def close_response_cache():
+    """Close the Redis connection pool"""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+async def cache_get(key: str) -> Optional[bytes]:
+    """Return the cached body for key, or None if missing or expired"""
+    if _redis is not None:
+        try:
+            return await _redis.get(key)
+        except Exception as e:
+            # A cache outage degrades to recomputing, never to a failed request
+            logger.warning(f"Response cache get failed for {key}: {e}")
+            return None
+    
+    entry = _local.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+
+async def cache_set(key: str, body: bytes, ttl: int):
+    """Store body under key for ttl seconds"""
+    if _redis is not None:
+        try:
+            await _redis.set(key, body, ex=ttl)
+        except Exception as e:
+            logger.warning(f"Response cache set failed for {key}: {e}")
+        return
+    
+    _local[key] = (time.monotonic() + ttl, body)
+
+
+async def cache_delete(key: str):
+    """Drop key so the next request recomputes it"""
+    _local.pop(key, None)
+    if _redis is not None:
+        try:
+            await _redis.delete(key)
+        except Exception as e:
+            logger.warning(f"Response cache delete failed for {key}: {e}")
+
+
+def cached_response(key: str, ttl: Optional[int] = None):
+    """
+    Cache a JSON endpoint's result under a fixed key for ttl seconds (default STATS_CACHE_TTL).
+    Hits return the stored bytes without calling the endpoint (and without touching the database).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            body = await cache_get(key)
+            if body is None:
+                body = orjson.dumps(await func(*args, **kwargs))
+                await cache_set(key, body, ttl or settings.STATS_CACHE_TTL)
+            return Response(content=body, media_type="application/json")
+        
+        return wrapper
+    
+    return decorator
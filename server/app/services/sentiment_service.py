@@ -3,22 +3,52 @@ Sentiment Analysis Service
 Uses VADER and transformers for sentiment analysis
 """
 
-from typing import Dict, Optional
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from transformers import pipeline
 from app.core.config import settings
 from app.core.logging import setup_logging
 from app.core.exceptions import SentimentAnalysisError
 
+# Optional ONNX Runtime backend for the INT8-quantized model
+try:
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
 logger = setup_logging()
 
+SENTIMENT_MODEL = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+
+# File written by ORTQuantizer.quantize into SENTIMENT_ONNX_DIR
+QUANTIZED_MODEL_FILE = "model_quantized.onnx"
+
 
 class SentimentService:
     """Service for analyzing tweet sentiment"""
     
+    # Texts per transformer forward pass in analyze_batch
+    BATCH_SIZE = 32
+    
+    # Recent results kept by content hash; reposts and cross-posts repeat the same text
+    CACHE_SIZE = 10_000
+    
+    # Texts up to this length may be labeled by the VADER neutral gate (SENTIMENT_NEUTRAL_GATE)
+    NEUTRAL_GATE_MAX_CHARS = 280
+    
     def __init__(self):
         """Initialize sentiment analyzers"""
         try:
+            # content hash -> result, least recently used first (analyze_batch runs in worker threads)
+            self._cache: OrderedDict[bytes, Dict[str, float]] = OrderedDict()
+            self._cache_lock = threading.Lock()
+            
             # VADER - fast and good for social media
             self.vader_analyzer = SentimentIntensityAnalyzer()
             
@@ -26,14 +56,52 @@ class SentimentService:
             # Using a lightweight model for production
             self.transformer_analyzer = pipeline(
                 "sentiment-analysis",
-                model="cardiffnlp/twitter-roberta-base-sentiment-latest",
+                model=self._load_int8_model() or SENTIMENT_MODEL,
+                tokenizer=SENTIMENT_MODEL,
                 device=-1,  # Use CPU by default
+                # Long Reddit posts exceed the model's 512-token window; cut them instead of failing
+                truncation=True,
+                batch_size=self.BATCH_SIZE,
             )
             logger.info("Sentiment analyzers initialized")
         except Exception as e:
             logger.error(f"Failed to initialize sentiment analyzers: {e}")
             raise SentimentAnalysisError(f"Sentiment analyzer initialization failed: {e}")
     
+    def _load_int8_model(self):
+        """
+        Load the INT8 ONNX Runtime model when SENTIMENT_ONNX_INT8 is enabled
+        The model is exported and dynamically quantized on first use and reused from disk afterwards.
+        Returns None (FP32 PyTorch model) when disabled, unavailable or the export fails.
+        """
+        if not settings.SENTIMENT_ONNX_INT8:
+            return None
+        if not ONNX_AVAILABLE:
+            logger.warning(
+                "SENTIMENT_ONNX_INT8 is set but optimum[onnxruntime] is not installed "
+                "(pip install -r requirements-optional.txt); using FP32 model"
+            )
+            return None
+        
+        model_dir = Path(settings.SENTIMENT_ONNX_DIR)
+        try:
+            if not (model_dir / QUANTIZED_MODEL_FILE).exists():
+                logger.info(f"Quantizing {SENTIMENT_MODEL} to INT8 in {model_dir} (one-time)...")
+                onnx_model = ORTModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL, export=True)
+                quantizer = ORTQuantizer.from_pretrained(onnx_model)
+                # Dynamic quantization: weights stored as INT8, activations quantized per batch;
+                # uses VNNI instructions where the CPU has them
+                quantizer.quantize(
+                    save_dir=model_dir,
+                    quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False),
+                )
+            model = ORTModelForSequenceClassification.from_pretrained(model_dir, file_name=QUANTIZED_MODEL_FILE)
+            logger.info("Sentiment transformer running INT8 on ONNX Runtime")
+            return model
+        except Exception as e:
+            logger.warning(f"INT8 sentiment model unavailable, using FP32 model: {e}")
+            return None
+    
     def analyze(self, text: str) -> Dict[str, float]:
         """
         Analyze sentiment of text
@@ -44,43 +112,138 @@ class SentimentService:
         Returns:
             Dictionary with sentiment scores and label
         """
+        key = self._content_key(text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
         try:
-            # VADER analysis
-            vader_scores = self.vader_analyzer.polarity_scores(text)
-            vader_compound = vader_scores["compound"]
-            
-            # Transformer analysis
-            transformer_result = self.transformer_analyzer(text)[0]
-            transformer_label = transformer_result["label"].lower()
-            transformer_score = transformer_result["score"]
-            
-            # Map transformer labels to scores
-            if "positive" in transformer_label:
-                transformer_sentiment = transformer_score
-            elif "negative" in transformer_label:
-                transformer_sentiment = -transformer_score
-            else:  # neutral
-                transformer_sentiment = 0.0
-            
-            # Weighted combination (VADER is good for social media, transformer for accuracy)
-            combined_score = (vader_compound * 0.4) + (transformer_sentiment * 0.6)
-            
-            # Determine label
-            if combined_score >= settings.SENTIMENT_THRESHOLD_POSITIVE:
-                label = "positive"
-            elif combined_score <= settings.SENTIMENT_THRESHOLD_NEGATIVE:
-                label = "negative"
+            vader_compound = self.vader_analyzer.polarity_scores(text)["compound"]
+            if self._is_vader_neutral(text, vader_compound):
+                result = self._vader_neutral(vader_compound)
             else:
-                label = "neutral"
-            
-            return {
-                "score": round(combined_score, 4),
-                "label": label,
-                "vader_score": round(vader_compound, 4),
-                "transformer_score": round(transformer_sentiment, 4),
-                "confidence": round(transformer_score, 4),
-            }
+                transformer_result = self.transformer_analyzer(text)[0]
+                result = self._combine(vader_compound, transformer_result)
         except Exception as e:
             logger.error(f"Sentiment analysis failed: {e}")
             raise SentimentAnalysisError(f"Sentiment analysis error: {e}")
-
+        
+        self._cache_put(key, result)
+        return dict(result)
+    
+    def analyze_batch(self, texts: List[str], batch_size: int = BATCH_SIZE) -> List[Dict[str, float]]:
+        """
+        Analyze sentiment of several texts
+        The transformer runs one batched forward pass per batch_size texts instead of one per text
+        
+        Args:
+            texts: Texts to analyze
+            batch_size: Transformer batch size
+            
+        Returns:
+            List of sentiment dictionaries (as returned by analyze), in input order
+        """
+        keys = [self._content_key(text) for text in texts]
+        results = [self._cache_get(key) for key in keys]
+        
+        # Only texts not seen before go through the models, each distinct text once
+        missing = {}
+        for text, key, result in zip(texts, keys, results):
+            if result is None:
+                missing.setdefault(key, text)
+        
+        if missing:
+            try:
+                # VADER first; only texts it can't settle as neutral go through the transformer
+                computed = {}
+                pending = []
+                for key, text in missing.items():
+                    vader_compound = self.vader_analyzer.polarity_scores(text)["compound"]
+                    if self._is_vader_neutral(text, vader_compound):
+                        computed[key] = self._vader_neutral(vader_compound)
+                    else:
+                        pending.append((key, text, vader_compound))
+                
+                if pending:
+                    transformer_results = self.transformer_analyzer(
+                        [text for _, text, _ in pending], batch_size=batch_size
+                    )
+                    for (key, _, vader_compound), transformer_result in zip(pending, transformer_results):
+                        computed[key] = self._combine(vader_compound, transformer_result)
+            except Exception as e:
+                logger.error(f"Sentiment analysis failed: {e}")
+                raise SentimentAnalysisError(f"Sentiment analysis error: {e}")
+            
+            for key, result in computed.items():
+                self._cache_put(key, result)
+            results = [result if result is not None else dict(computed[key]) for key, result in zip(keys, results)]
+        
+        return results
+    
+    @staticmethod
+    def _content_key(text: str) -> bytes:
+        """Cache key for a text"""
+        return hashlib.blake2b(text.encode(), digest_size=16).digest()
+    
+    def _cache_get(self, key: bytes) -> Optional[Dict[str, float]]:
+        """Copy of the cached result for key, or None"""
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is None:
+                return None
+            self._cache.move_to_end(key)
+        return dict(result)
+    
+    def _cache_put(self, key: bytes, result: Dict[str, float]):
+        """Cache a result, evicting the least recently used beyond CACHE_SIZE"""
+        with self._cache_lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+    
+    def _is_vader_neutral(self, text: str, vader_compound: float) -> bool:
+        """Whether the neutral gate labels this text without the transformer"""
+        return abs(vader_compound) < settings.SENTIMENT_NEUTRAL_GATE and len(text) <= self.NEUTRAL_GATE_MAX_CHARS
+    
+    def _vader_neutral(self, vader_compound: float) -> Dict[str, float]:
+        """Neutral result for a text settled by the neutral gate"""
+        return {
+            "score": round(vader_compound, 4),
+            "label": "neutral",
+            "vader_score": round(vader_compound, 4),
+            "transformer_score": 0.0,
+            "confidence": 0.0,
+        }
+    
+    def _combine(self, vader_compound: float, transformer_result: Dict) -> Dict[str, float]:
+        """Combine VADER and transformer outputs into the final score and label"""
+        transformer_label = transformer_result["label"].lower()
+        transformer_score = transformer_result["score"]
+        
+        # Map transformer labels to scores
+        if "positive" in transformer_label:
+            transformer_sentiment = transformer_score
+        elif "negative" in transformer_label:
+            transformer_sentiment = -transformer_score
+        else:  # neutral
+            transformer_sentiment = 0.0
+        
+        # Weighted combination (VADER is good for social media, transformer for accuracy)
+        combined_score = (vader_compound * 0.4) + (transformer_sentiment * 0.6)
+        
+        # Determine label
+        if combined_score >= settings.SENTIMENT_THRESHOLD_POSITIVE:
+            label = "positive"
+        elif combined_score <= settings.SENTIMENT_THRESHOLD_NEGATIVE:
+            label = "negative"
+        else:
+            label = "neutral"
+        
+        return {
+            "score": round(combined_score, 4),
+            "label": label,
+            "vader_score": round(vader_compound, 4),
+            "transformer_score": round(transformer_sentiment, 4),
+            "confidence": round(transformer_score, 4),
+        }
@@ -3,12 +3,17 @@ Trading Service
 Handles trading operations via Alpaca API
 """
 
+import asyncio
+import time
+from functools import lru_cache
 from typing import Optional, Dict
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.core.config import settings
 from app.core.logging import setup_logging
 from app.core.exceptions import TradingAPIError
+from app.db.database import AsyncSessionLocal
 from app.db.models import Trade, Position, Tweet
 
 logger = setup_logging()
@@ -23,9 +28,30 @@ except ImportError:
     logger.warning("Alpaca trading API not available. Trading features will be disabled.")
 
 
+@lru_cache(maxsize=2048)
+def _position_size_for(sentiment_strength: float) -> float:
+    """
+    Calculate position size based on sentiment and risk management
+    Cached: scores arrive rounded to 4 decimals and settings are immutable, so strengths repeat
+    
+    Args:
+        sentiment_strength: Absolute sentiment score from 0 to 1
+        
+    Returns:
+        Position size in dollars
+    """
+    # Scale position size based on sentiment strength
+    # Stronger sentiment = larger position (up to max)
+    max_size = settings.MAX_POSITION_SIZE
+    return round(min(max_size * sentiment_strength, max_size), 2)
+
+
 class TradingService:
     """Service for trading operations"""
     
+    # Account snapshots (buying power) are reused for this long between trades (seconds)
+    ACCOUNT_CACHE_TTL = 5.0
+    
     def __init__(self):
         """Initialize trading client"""
         if not ALPACA_AVAILABLE:
@@ -66,28 +92,20 @@ class TradingService:
                 else:
                     logger.error(f"Failed to initialize trading client: {e}")
                 self.client = None
-    
-    def _calculate_position_size(self, sentiment_score: float) -> float:
-        """
-        Calculate position size based on sentiment and risk management
-        
-        Args:
-            sentiment_score: Sentiment score from -1 to 1
-            
-        Returns:
-            Position size in dollars
-        """
-        # Base position size on sentiment strength
-        sentiment_strength = abs(sentiment_score)
         
-        # Scale position size based on sentiment strength
-        # Stronger sentiment = larger position (up to max)
-        position_size = min(
-            settings.MAX_POSITION_SIZE * sentiment_strength,
-            settings.MAX_POSITION_SIZE,
-        )
-        
-        return round(position_size, 2)
+        self.position_sync_task: Optional[asyncio.Task] = None
+        self.positions_last_refresh = 0.0  # time.monotonic() of the last completed sync
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._account = None
+        self._account_fetched_at = 0.0
+    
+    async def _get_account(self):
+        """Return the trading account, fetched at most once per ACCOUNT_CACHE_TTL"""
+        if self._account is None or time.monotonic() - self._account_fetched_at >= self.ACCOUNT_CACHE_TTL:
+            # The Alpaca SDK is synchronous; keep its HTTP call off the event loop
+            self._account = await asyncio.to_thread(self.client.get_account)
+            self._account_fetched_at = time.monotonic()
+        return self._account
     
     async def execute_trade(
         self,
@@ -128,12 +146,12 @@ class TradingService:
                 logger.info(f"Sentiment {sentiment_score} is neutral, skipping trade")
                 return None
             
-            # Get current price
-            account = self.client.get_account()
+            # Get available buying power
+            account = await self._get_account()
             buying_power = float(account.buying_power)
             
-            # Calculate position size
-            position_size_dollars = self._calculate_position_size(abs(sentiment_score))
+            # Calculate position size from sentiment strength
+            position_size_dollars = _position_size_for(abs(sentiment_score))
             
             # Check if we have enough buying power
             if side == OrderSide.BUY and position_size_dollars > buying_power:
@@ -159,7 +177,9 @@ class TradingService:
             )
             
             # Submit order
-            order = self.client.submit_order(order_data=market_order_data)
+            order = await asyncio.to_thread(self.client.submit_order, order_data=market_order_data)
+            # Buying power changed; the next trade re-reads the account
+            self._account = None
             
             # Save trade to database
             trade = Trade(
@@ -175,8 +195,9 @@ class TradingService:
             )
             
             session.add(trade)
+            # id and created_at come back from the INSERT's RETURNING (eager_defaults);
+            # sessions don't expire on commit, so no reload is needed
             await session.commit()
-            await session.refresh(trade)
             
             logger.info(f"Trade executed: {side.value} {quantity} {symbol} at ${current_price}")
             return trade
@@ -195,38 +216,118 @@ class TradingService:
             logger.error(f"Failed to get positions: {e}")
             return []
     
-    async def update_positions(self, session: AsyncSession):
-        """Update positions from trading account"""
+    async def update_positions(self, session: AsyncSession) -> list[Position]:
+        """
+        Update positions from trading account
+        Runs on the caller's session; refresh_positions coalesces concurrent syncs
+        
+        Returns:
+            The synced Position rows
+        """
         if not self.client:
-            return
+            return []
         
+        return await self._sync_positions(session)
+    
+    async def _sync_positions(self, session: AsyncSession) -> list[Position]:
+        """Fetch positions from the broker and upsert them"""
         try:
-            positions = self.client.get_all_positions()
+            # The Alpaca SDK is synchronous; keep its HTTP call off the event loop
+            positions = await asyncio.to_thread(self.client.get_all_positions)
+            if not positions:
+                return []
             
-            for pos in positions:
-                # Update or create position in database
-                result = await session.execute(
-                    select(Position).where(Position.symbol == pos.symbol)
-                )
-                db_position = result.scalar_one_or_none()
-                
-                if db_position:
-                    db_position.quantity = float(pos.qty)
-                    db_position.average_price = float(pos.avg_entry_price)
-                    db_position.current_price = float(pos.current_price)
-                    db_position.unrealized_pnl = float(pos.unrealized_pl)
-                else:
-                    db_position = Position(
-                        symbol=pos.symbol,
-                        quantity=float(pos.qty),
-                        average_price=float(pos.avg_entry_price),
-                        current_price=float(pos.current_price),
-                        unrealized_pnl=float(pos.unrealized_pl),
-                    )
-                    session.add(db_position)
+            rows = [
+                {
+                    "symbol": pos.symbol,
+                    "quantity": float(pos.qty),
+                    "average_price": float(pos.avg_entry_price),
+                    "current_price": float(pos.current_price),
+                    "unrealized_pnl": float(pos.unrealized_pl),
+                }
+                for pos in positions
+            ]
+            
+            # Upsert every position in a single statement
+            stmt = pg_insert(Position).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Position.symbol],
+                set_={
+                    "quantity": stmt.excluded.quantity,
+                    "average_price": stmt.excluded.average_price,
+                    "current_price": stmt.excluded.current_price,
+                    "unrealized_pnl": stmt.excluded.unrealized_pnl,
+                    "updated_at": func.now(),
+                },
+            ).returning(Position)
+            
+            result = await session.execute(stmt)
+            synced = list(result.scalars().all())
             
             await session.commit()
+            return synced
         except Exception as e:
             await session.rollback()
             logger.error(f"Failed to update positions: {e}")
-
+            return []
+    
+    async def refresh_positions(self):
+        """
+        Sync positions from the trading account using a dedicated database session.
+        Concurrent callers share the refresh already in flight.
+        """
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_positions())
+        await asyncio.shield(self._refresh_task)
+    
+    async def _refresh_positions(self):
+        """Run a single position sync"""
+        async with AsyncSessionLocal() as session:
+            await self.update_positions(session)
+        self.positions_last_refresh = time.monotonic()
+    
+    def request_positions_refresh(self, max_age: float):
+        """
+        Schedule a background sync if positions are older than max_age seconds.
+        Does not wait for the sync; callers keep serving the current database rows.
+        """
+        if not self.client:
+            return
+        if time.monotonic() - self.positions_last_refresh < max_age:
+            return
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_positions())
+    
+    async def start_position_sync(self):
+        """Start background position sync task"""
+        if not self.client:
+            logger.info("Trading client not initialized, position sync disabled")
+            return
+        if self.position_sync_task:
+            logger.warning("Position sync already started")
+            return
+        
+        self.position_sync_task = asyncio.create_task(self._position_sync_loop())
+        logger.info("Position sync started")
+    
+    async def stop_position_sync(self):
+        """Stop background position sync task"""
+        for task in (self.position_sync_task, self._refresh_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self.position_sync_task = None
+        self._refresh_task = None
+    
+    async def _position_sync_loop(self):
+        """Background position sync loop"""
+        while True:
+            try:
+                await self.refresh_positions()
+            except Exception as e:
+                logger.error(f"Error in position sync loop: {e}")
+            
+            await asyncio.sleep(settings.POSITION_SYNC_INTERVAL)
@@ -5,37 +5,229 @@ Handles Twitter API interactions and tweet monitoring
 
 import asyncio
 import os
+import random
+import re
 import ssl
+import time
+import aiohttp
 import certifi
-from typing import List, Optional, Dict
-from datetime import datetime, timezone
+from typing import Awaitable, List, Optional, Dict, Set, Tuple
+from datetime import datetime, timedelta, timezone
 from tweepy.asynchronous import AsyncClient
+from tweepy.errors import Forbidden, NotFound, TooManyRequests, Unauthorized
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import bindparam, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.core.config import settings
 from app.core.logging import setup_logging
-from app.core.exceptions import TwitterAPIError
-from app.db.models import Tweet
+from app.core.exceptions import TwitterAPIError, TwitterRateLimitError
+from app.db.database import AsyncSessionLocal
+from app.db.models import Tweet, TwitterUser
 from app.services.sentiment_service import SentimentService
 
 logger = setup_logging()
 
-# Set SSL certificate file for aiohttp (used by tweepy)
-# Must be set before any aiohttp imports
+# Existing rows for a batch of tweet_ids; the expanding parameter keeps one cached statement
+# for any batch size
+_TWEETS_BY_TWEET_IDS = select(*Tweet.__table__.c).where(
+    Tweet.tweet_id.in_(bindparam("tweet_ids", expanding=True))
+)
+
+# Moves a user's since_id forward (executed once per user with new tweets)
+_twitter_users = TwitterUser.__table__
+_ADVANCE_LAST_TWEET_ID = (
+    update(_twitter_users)
+    .where(_twitter_users.c.username == bindparam("name"))
+    .where(or_(
+        _twitter_users.c.last_tweet_id.is_(None),
+        _twitter_users.c.last_tweet_id < bindparam("newest_id"),
+    ))
+    .values(last_tweet_id=bindparam("newest_id"))
+)
+
+# Stores one tweet's sentiment (executed once per analyzed tweet)
+_tweets = Tweet.__table__
+_SET_SENTIMENT = (
+    update(_tweets)
+    .where(_tweets.c.id == bindparam("row_id"))
+    .values(sentiment_score=bindparam("score"), sentiment_label=bindparam("label"))
+)
+
+# Point the other HTTP clients (Reddit, market data) at certifi's CA bundle
+# for Python builds without system certificates
 cert_path = certifi.where()
 os.environ['SSL_CERT_FILE'] = cert_path
 os.environ['REQUESTS_CA_BUNDLE'] = cert_path
 os.environ['CURL_CA_BUNDLE'] = cert_path
 
-# Also set for Python's ssl module
-ssl._create_default_https_context = ssl._create_unverified_context
+# Verified TLS context for the Twitter connection, built once and shared by all its connections
+_SSL_CONTEXT = ssl.create_default_context(cafile=cert_path)
+
+# Longest wait for an exhausted rate-limit window to reset; beyond this calls fail fast (seconds)
+MAX_RATE_LIMIT_WAIT = 5.0
+
+# Backoff after a 429 that carries no reset time: min(cap, base * 2**attempt) plus jitter (seconds)
+RATE_LIMIT_BACKOFF_BASE = 5.0
+RATE_LIMIT_BACKOFF_CAP = 900.0
+RATE_LIMIT_JITTER = 1.0
+
+# Shortest pause between monitoring cycles, however long a cycle took (seconds)
+MIN_CHECK_DELAY = 1.0
+
+# A 429 from the API, or a call refused locally because the window is used up
+RATE_LIMIT_ERRORS = (TooManyRequests, TwitterRateLimitError)
+
+# Numeric path segments (user and tweet IDs)
+_ID_SEGMENT = re.compile(r"/\d+")
+
+
+def _rate_limit_endpoint(method: str, route: str, user_auth: bool) -> str:
+    """Rate-limit bucket for a request: IDs in the path share their endpoint's limit"""
+    path = _ID_SEGMENT.sub("/:id", route)
+    return f"{method} {path} {'user' if user_auth else 'app'}"
+
+
+class RateLimitedAsyncClient(AsyncClient):
+    """
+    AsyncClient that paces requests from the x-rate-limit-* headers of earlier responses
+    Once an endpoint's window is used up, calls wait for the reset if it is near
+    and otherwise raise TwitterRateLimitError without spending a request
+    Requests share one keep-alive session (tweepy otherwise opens a new one, and a new
+    TLS handshake, per request)
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # endpoint -> (requests remaining, window reset as epoch seconds)
+        self._rate_limits: Dict[str, Tuple[int, float]] = {}
+        # endpoint -> consecutive 429 responses
+        self._rate_limit_strikes: Dict[str, int] = {}
+        # endpoint -> first request into a reset window, resolved once its response is recorded
+        self._window_probes: Dict[str, asyncio.Future] = {}
+    
+    def _ensure_session(self):
+        """Create the shared session on first use so it binds to the running event loop"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                ssl=_SSL_CONTEXT,
+                limit_per_host=64,
+                ttl_dns_cache=300,
+                keepalive_timeout=75,
+            )
+            self.session = aiohttp.ClientSession(connector=connector)
+    
+    async def close(self):
+        """Close the shared session and its connection pool"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+    
+    async def request(self, method, route, params=None, json=None, user_auth=False):
+        self._ensure_session()
+        endpoint = _rate_limit_endpoint(method, route, user_auth)
+        probe = await self._acquire(endpoint)
+        try:
+            try:
+                response = await super().request(method, route, params, json, user_auth)
+            except TooManyRequests as e:
+                self._back_off(endpoint, e.response.headers)
+                raise
+            self._rate_limit_strikes.pop(endpoint, None)
+            self._record(endpoint, response.headers)
+            return response
+        finally:
+            if probe is not None:
+                del self._window_probes[endpoint]
+                probe.set_result(None)
+    
+    async def _acquire(self, endpoint: str) -> Optional[asyncio.Future]:
+        """
+        Take one request from the endpoint's current window
+        Returns a future when this call probes a reset window; request() resolves it
+        """
+        while True:
+            probe = self._window_probes.get(endpoint)
+            if probe is not None:
+                # Another caller is probing the new window; pace on the size its response reports
+                await asyncio.shield(probe)
+                continue
+            window = self._rate_limits.get(endpoint)
+            if window is None:
+                return None
+            remaining, reset_at = window
+            if remaining > 0:
+                # Counted before the response arrives so concurrent callers can't overspend the window
+                self._rate_limits[endpoint] = (remaining - 1, reset_at)
+                return None
+            delay = reset_at - time.time()
+            if delay > MAX_RATE_LIMIT_WAIT:
+                raise TwitterRateLimitError(
+                    f"Twitter API rate limit exhausted for {endpoint}, resets in {delay:.0f}s"
+                )
+            if delay > 0:
+                logger.info(f"Twitter rate limit window for {endpoint} resets in {delay:.1f}s, waiting")
+                await asyncio.sleep(delay)
+                # Callers that slept on the same window wake together; re-check so only one probes
+                continue
+            # Fresh window; its size is learned from this request's response
+            self._rate_limits.pop(endpoint, None)
+            probe = asyncio.get_running_loop().create_future()
+            self._window_probes[endpoint] = probe
+            return probe
+    
+    def seconds_until_reopen(self) -> float:
+        """Seconds until the first exhausted endpoint window resets (0 if none is exhausted)"""
+        now = time.time()
+        return min(
+            (reset_at - now for remaining, reset_at in self._rate_limits.values() if remaining <= 0 and reset_at > now),
+            default=0.0,
+        )
+    
+    def _record(self, endpoint: str, headers):
+        """Update an endpoint's window from response headers"""
+        try:
+            reset_at = float(headers["x-rate-limit-reset"])
+            remaining = int(headers["x-rate-limit-remaining"])
+        except (KeyError, TypeError, ValueError):
+            return
+        self._rate_limits[endpoint] = (remaining, reset_at)
+    
+    def _back_off(self, endpoint: str, headers):
+        """
+        Close an endpoint's window after a 429 until its reset time, or with exponential
+        backoff when the response has none; jitter keeps callers from retrying in lockstep
+        """
+        strikes = self._rate_limit_strikes.get(endpoint, 0)
+        self._rate_limit_strikes[endpoint] = strikes + 1
+        try:
+            reset_at = float(headers["x-rate-limit-reset"])
+        except (KeyError, TypeError, ValueError):
+            reset_at = time.time() + min(RATE_LIMIT_BACKOFF_CAP, RATE_LIMIT_BACKOFF_BASE * 2 ** min(strikes, 10))
+        self._rate_limits[endpoint] = (0, reset_at + random.uniform(0, RATE_LIMIT_JITTER))
 
 
 class TwitterService:
     """Service for Twitter API interactions"""
     
-    def __init__(self):
-        """Initialize Twitter client"""
+    # Usernames per users/by lookup (API maximum)
+    USER_LOOKUP_BATCH = 100
+    
+    # search/recent accepts 10-100 results per request
+    SEARCH_MIN_RESULTS = 10
+    SEARCH_MAX_RESULTS = 100
+    
+    # Username -> ID mappings are reused this long (seconds); IDs never change, usernames rarely do
+    USER_ID_TTL = 24 * 3600
+    # Usernames that don't exist are not looked up again for this long
+    USER_NOT_FOUND_TTL = 15 * 60
+    
+    # Batches waiting for the next stage (save, sentiment); a full queue holds the previous stage back
+    MONITOR_QUEUE_SIZE = 100
+    # How long stop_monitoring waits for each stage to finish its queued batches (seconds)
+    MONITOR_DRAIN_TIMEOUT = 10.0
+    
+    def __init__(self, sentiment_service: SentimentService):
+        """Initialize Twitter client; sentiment_service is shared with the API (the models load once)"""
         # Check if we have the minimum required credentials
         has_bearer = bool(settings.TWITTER_BEARER_TOKEN and len(settings.TWITTER_BEARER_TOKEN) >= 50)
         has_oauth = bool(
@@ -62,7 +254,7 @@ class TwitterService:
         # Initialize client with all available credentials
         # tweepy will use Bearer Token when available, fall back to OAuth 1.0a if needed
         # wait_on_rate_limit=False to prevent blocking - we'll handle rate limits gracefully
-        self.client = AsyncClient(
+        self.client = RateLimitedAsyncClient(
             bearer_token=settings.TWITTER_BEARER_TOKEN if has_bearer else None,
             consumer_key=settings.TWITTER_API_KEY if has_oauth else None,
             consumer_secret=settings.TWITTER_API_SECRET if has_oauth else None,
@@ -71,11 +263,79 @@ class TwitterService:
             wait_on_rate_limit=False,  # Don't block on rate limits - handle gracefully
         )
         
-        self.sentiment_service = SentimentService()
+        self.sentiment_service = sentiment_service
         self.monitoring_task: Optional[asyncio.Task] = None
+        self.persist_task: Optional[asyncio.Task] = None
+        self.sentiment_task: Optional[asyncio.Task] = None
+        # Fetch stage -> persist stage: lists of tweet dicts, one per user per cycle
+        self._tweet_queue: asyncio.Queue = asyncio.Queue(maxsize=self.MONITOR_QUEUE_SIZE)
+        # Persist stage -> sentiment stage: lists of (row id, content) for newly inserted tweets
+        self._sentiment_queue: asyncio.Queue = asyncio.Queue(maxsize=self.MONITOR_QUEUE_SIZE)
         self.is_monitoring = False
         self._has_bearer = has_bearer
         self._has_oauth = has_oauth
+        # lowercase username -> (user_id, or None if not found; monotonic expiry)
+        self._user_ids: Dict[str, Tuple[Optional[int], float]] = {}
+        # lowercase username -> newest tweet ID stored by the monitor
+        self._last_tweet_ids: Dict[str, int] = {}
+    
+    @staticmethod
+    def _user_key(username: str) -> str:
+        """Cache key for a username (Twitter usernames are case-insensitive)"""
+        return username.lstrip('@').lower()
+    
+    def _cached_user_id(self, username: str) -> Tuple[bool, Optional[int]]:
+        """Return (hit, user_id); user_id is None on a hit for a user that doesn't exist"""
+        entry = self._user_ids.get(self._user_key(username))
+        if entry is None or entry[1] <= time.monotonic():
+            return False, None
+        return True, entry[0]
+    
+    def _remember_user_id(self, username: str, user_id: Optional[int], ttl: float):
+        """Cache a lookup result (user_id None for a user that doesn't exist)"""
+        self._user_ids[self._user_key(username)] = (user_id, time.monotonic() + ttl)
+    
+    async def load_user_ids(self):
+        """Warm the user ID cache and the monitor's since_ids from the twitter_users table"""
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=self.USER_ID_TTL)
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(
+                        TwitterUser.username,
+                        TwitterUser.user_id,
+                        TwitterUser.fetched_at,
+                        TwitterUser.last_tweet_id,
+                    )
+                )
+                rows = result.all()
+        except Exception as e:
+            logger.warning(f"Could not load cached Twitter user IDs: {e}")
+            return
+        
+        for username, user_id, fetched_at, last_tweet_id in rows:
+            if fetched_at > cutoff:
+                self._remember_user_id(username, user_id, (fetched_at - cutoff).total_seconds())
+            if last_tweet_id is not None:
+                self._last_tweet_ids[username] = last_tweet_id
+        logger.info(f"Loaded {len(rows)} cached Twitter user ID(s)")
+    
+    async def _store_user_ids(self, user_ids: Dict[str, int]):
+        """Persist resolved user IDs; a failure only costs a lookup after the next restart"""
+        fetched_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        try:
+            async with AsyncSessionLocal() as session:
+                stmt = pg_insert(TwitterUser).values([
+                    {"username": self._user_key(username), "user_id": user_id, "fetched_at": fetched_at}
+                    for username, user_id in user_ids.items()
+                ])
+                await session.execute(stmt.on_conflict_do_update(
+                    index_elements=[TwitterUser.username],
+                    set_={"user_id": stmt.excluded.user_id, "fetched_at": stmt.excluded.fetched_at},
+                ))
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"Could not store Twitter user IDs: {e}")
     
     async def _test_authentication(self):
         """Test Twitter API authentication"""
@@ -86,28 +346,32 @@ class TwitterService:
                 logger.info("Twitter API authentication successful")
             else:
                 logger.warning("Twitter API authentication test returned no data")
+        except RATE_LIMIT_ERRORS:
+            logger.warning(
+                "Twitter API rate limit exceeded. Authentication test skipped. "
+                "The server will continue to run and retry later. "
+                "Rate limits reset periodically - check your Twitter API usage in the developer portal."
+            )
+        except Unauthorized as e:
+            logger.error(
+                "Twitter API authentication failed. Please check:\n"
+                "1. Bearer Token is valid and not expired (regenerate if needed)\n"
+                "2. OAuth 1.0a credentials are correct (API Key, Secret, Access Token, Access Token Secret)\n"
+                "3. App permissions are set to 'Read' in Twitter Developer Portal\n"
+                f"Error: {e}"
+            )
         except Exception as e:
-            error_msg = str(e)
-            if "429" in error_msg or "rate limit" in error_msg.lower() or "Too Many Requests" in error_msg:
-                logger.warning(
-                    "Twitter API rate limit exceeded. Authentication test skipped. "
-                    "The server will continue to run and retry later. "
-                    "Rate limits reset periodically - check your Twitter API usage in the developer portal."
-                )
-            elif "401" in error_msg or "Unauthorized" in error_msg:
-                logger.error(
-                    "Twitter API authentication failed. Please check:\n"
-                    "1. Bearer Token is valid and not expired (regenerate if needed)\n"
-                    "2. OAuth 1.0a credentials are correct (API Key, Secret, Access Token, Access Token Secret)\n"
-                    "3. App permissions are set to 'Read' in Twitter Developer Portal\n"
-                    f"Error: {e}"
-                )
-            else:
-                logger.warning(f"Twitter API authentication test failed: {e}")
+            logger.warning(f"Twitter API authentication test failed: {e}")
+    
+    async def _resolved_user_id(self, username: str, user_id: int) -> int:
+        """Cache and persist a freshly looked-up user ID"""
+        self._remember_user_id(username, user_id, self.USER_ID_TTL)
+        await self._store_user_ids({username: user_id})
+        return user_id
     
     async def get_user_id(self, username: str) -> tuple:
         """
-        Get user ID from username
+        Get user ID from username (cached for USER_ID_TTL, misses for USER_NOT_FOUND_TTL)
         Returns: (user_id, error_type)
         error_type can be: 'rate_limit', 'auth_error', 'not_found', 'no_credentials', 'unknown'
         """
@@ -116,64 +380,91 @@ class TwitterService:
             logger.error("Twitter API credentials not configured")
             return None, 'no_credentials'
         
+        hit, user_id = self._cached_user_id(username)
+        if hit:
+            return (user_id, None) if user_id is not None else (None, 'not_found')
+        
         try:
-            # Try with username first
-            try:
-                user = await self.client.get_user(username=username)
-                if user and user.data:
-                    return user.data.id, None
-            except Exception as e1:
-                # If that fails, try with @ prefix
-                try:
-                    username_clean = username.lstrip('@')
-                    user = await self.client.get_user(username=username_clean)
-                    if user and user.data:
-                        return user.data.id, None
-                except Exception as e2:
-                    error_msg1 = str(e1)
-                    error_msg2 = str(e2)
-                    # Check for rate limit errors (429)
-                    if "429" in error_msg1 or "rate limit" in error_msg1.lower() or "Too Many Requests" in error_msg1:
-                        logger.warning(f"Twitter API rate limit exceeded for {username}")
-                        return None, 'rate_limit'
-                    # Check for authentication errors (401)
-                    elif "401" in error_msg1 or "Unauthorized" in error_msg1 or "Invalid" in error_msg1:
-                        logger.error(f"Twitter API authentication failed for {username}: {e1}")
-                        return None, 'auth_error'
-                    # Check for not found (404)
-                    elif "404" in error_msg1 or "Not Found" in error_msg1:
-                        logger.warning(f"User @{username} not found on Twitter")
-                        return None, 'not_found'
-                    else:
-                        logger.error(f"Failed to get user ID for {username}: {e1}")
-                        return None, 'unknown'
+            # tweepy expects the bare username
+            user = await self.client.get_user(username=username.lstrip('@'))
+        except RATE_LIMIT_ERRORS:
+            logger.warning(f"Twitter API rate limit exceeded for {username}")
+            return None, 'rate_limit'
+        except (Unauthorized, Forbidden) as e:
+            logger.error(f"Twitter API authentication failed for {username}: {e}")
+            return None, 'auth_error'
+        except NotFound:
+            user = None
         except Exception as e:
-            error_msg = str(e)
-            if "429" in error_msg or "rate limit" in error_msg.lower() or "Too Many Requests" in error_msg:
-                logger.warning(f"Twitter API rate limit exceeded for {username}")
-                return None, 'rate_limit'
-            elif "401" in error_msg or "Unauthorized" in error_msg or "Invalid" in error_msg:
-                logger.error(f"Twitter API authentication failed for {username}: {e}")
-                return None, 'auth_error'
-            elif "404" in error_msg or "Not Found" in error_msg:
-                logger.warning(f"User @{username} not found on Twitter")
-                return None, 'not_found'
-            else:
-                logger.error(f"Failed to get user ID for {username}: {e}")
-                return None, 'unknown'
+            logger.error(f"Failed to get user ID for {username}: {e}")
+            return None, 'unknown'
+        
+        # Unknown usernames usually come back as a 200 response carrying only an error
+        if user is None or not user.data:
+            logger.warning(f"User @{username} not found on Twitter")
+            self._remember_user_id(username, None, self.USER_NOT_FOUND_TTL)
+            return None, 'not_found'
+        
+        return await self._resolved_user_id(username, user.data.id), None
+    
+    async def get_user_ids(self, usernames: List[str]) -> Dict[str, int]:
+        """
+        Resolve several usernames with one users/by request per USER_LOOKUP_BATCH names
+        Only names missing from the user ID cache are looked up
+        Returns {username: user_id} for the users that exist, keyed by the usernames as given;
+        API errors (rate limit, auth) are raised to the caller
+        """
+        user_ids = {}
+        # Twitter matches usernames case-insensitively and returns its own casing
+        requested = {}
+        for username in usernames:
+            hit, user_id = self._cached_user_id(username)
+            if not hit:
+                requested[self._user_key(username)] = username
+            elif user_id is not None:
+                user_ids[username] = user_id
+        
+        names = list(requested)
+        resolved = {}
+        for start in range(0, len(names), self.USER_LOOKUP_BATCH):
+            response = await self.client.get_users(usernames=names[start:start + self.USER_LOOKUP_BATCH])
+            for user in response.data or []:
+                username = requested.pop(user.username.lower(), None)
+                if username is not None:
+                    resolved[username] = user.id
+                    self._remember_user_id(username, user.id, self.USER_ID_TTL)
         
-        return None, 'unknown'
+        # Names the API did not return don't exist (or are suspended)
+        for username in requested.values():
+            self._remember_user_id(username, None, self.USER_NOT_FOUND_TTL)
+        
+        if resolved:
+            await self._store_user_ids(resolved)
+            user_ids.update(resolved)
+        return user_ids
     
-    async def get_recent_tweets(self, username: str, max_results: int = 10) -> List[Dict]:
-        """Get recent tweets from a user"""
+    async def get_recent_tweets(
+        self,
+        username: str,
+        max_results: int = 10,
+        user_id: Optional[int] = None,
+        since_id: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Get recent tweets from a user
+        user_id skips the username lookup when already known; since_id limits the result
+        to tweets newer than that ID
+        """
         try:
-            user_id, error_type = await self.get_user_id(username)
-            if not user_id:
-                return []
+            if user_id is None:
+                user_id, error_type = await self.get_user_id(username)
+                if not user_id:
+                    return []
             
             tweets = await self.client.get_users_tweets(
                 id=user_id,
                 max_results=max_results,
+                since_id=since_id,
                 tweet_fields=["created_at", "text", "public_metrics"],
             )
             
@@ -189,93 +480,281 @@ class TwitterService:
                 }
                 for tweet in tweets.data
             ]
+        except RATE_LIMIT_ERRORS:
+            logger.warning(f"Twitter API rate limit exceeded for {username}. Will retry later.")
+            return []  # Return empty list instead of raising error
         except Exception as e:
-            error_msg = str(e)
-            if "429" in error_msg or "rate limit" in error_msg.lower() or "Too Many Requests" in error_msg:
-                logger.warning(f"Twitter API rate limit exceeded for {username}. Will retry later.")
-                return []  # Return empty list instead of raising error
             logger.error(f"Failed to get tweets for {username}: {e}")
             raise TwitterAPIError(f"Failed to fetch tweets: {e}")
     
-    async def save_tweet(self, session: AsyncSession, tweet_data: Dict) -> Tweet:
-        """Save tweet to database without sentiment analysis"""
+    async def _search_recent_tweets(
+        self,
+        users: List[Tuple[str, int]],
+        max_results: int = 100,
+        since_id: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Get recent tweets (last 7 days) from several users with one search request
+        users are (username, user_id) pairs; tweets are attributed by author ID
+        """
+        usernames_by_id = {user_id: username for username, user_id in users}
+        query = " OR ".join(f"from:{username.lstrip('@')}" for username, _ in users)
         try:
-            # Check if tweet already exists
-            result = await session.execute(
-                select(Tweet).where(Tweet.tweet_id == tweet_data["tweet_id"])
+            tweets = await self.client.search_recent_tweets(
+                query=query,
+                max_results=max_results,
+                since_id=since_id,
+                tweet_fields=["created_at", "text", "public_metrics", "author_id"],
             )
-            existing_tweet = result.scalar_one_or_none()
             
-            if existing_tweet:
-                return existing_tweet
+            if not tweets.data:
+                return []
             
+            return [
+                {
+                    "tweet_id": str(tweet.id),
+                    "author_username": usernames_by_id[tweet.author_id],
+                    "content": tweet.text,
+                    "created_at": tweet.created_at,
+                }
+                for tweet in tweets.data
+                if tweet.author_id in usernames_by_id
+            ]
+        except RATE_LIMIT_ERRORS:
+            logger.warning(f"Twitter API rate limit exceeded for search ({query}). Will retry later.")
+            return []
+        except Exception as e:
+            logger.error(f"Failed to search tweets ({query}): {e}")
+            raise TwitterAPIError(f"Failed to search tweets: {e}")
+    
+    async def save_tweets(self, session: AsyncSession, tweets_data: List[Dict]) -> Tuple[List[Dict], Set[str]]:
+        """
+        Save tweets to database without sentiment analysis
+        Returns (rows in input order, tweet_ids that were newly inserted); existing tweets are left untouched
+        """
+        # Keyed by tweet_id: drops duplicates within the batch and keeps input order
+        values = {}
+        for tweet_data in tweets_data:
             # Convert timezone-aware datetime to timezone-naive UTC
             # Twitter API returns timezone-aware datetimes, but database expects timezone-naive
             created_at = tweet_data["created_at"]
             if created_at and hasattr(created_at, 'tzinfo') and created_at.tzinfo is not None:
-                # Convert to UTC and remove timezone info
                 created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
             
-            # Create new tweet without sentiment analysis
-            tweet = Tweet(
-                tweet_id=tweet_data["tweet_id"],
-                author_username=tweet_data["author_username"],
-                content=tweet_data["content"],
-                created_at=created_at,
-                sentiment_score=None,
-                sentiment_label=None,
-                processed=False,
+            values.setdefault(tweet_data["tweet_id"], {
+                "tweet_id": tweet_data["tweet_id"],
+                "author_username": tweet_data["author_username"],
+                "content": tweet_data["content"],
+                "created_at": created_at,
+                "sentiment_score": None,
+                "sentiment_label": None,
+                "processed": False,
+            })
+        
+        if not values:
+            return [], set()
+        
+        columns = Tweet.__table__.c
+        try:
+            # One INSERT for the whole batch; the unique index on tweet_id does the dedup
+            # and RETURNING yields only the rows that were actually inserted
+            result = await session.execute(
+                pg_insert(Tweet)
+                .values(list(values.values()))
+                .on_conflict_do_nothing(index_elements=["tweet_id"])
+                .returning(*columns)
             )
+            rows_by_id = {row["tweet_id"]: row for row in result.mappings().all()}
+            inserted_ids = set(rows_by_id)
             
-            session.add(tweet)
-            await session.commit()
-            await session.refresh(tweet)
+            existing_ids = values.keys() - inserted_ids
+            if existing_ids:
+                result = await session.execute(_TWEETS_BY_TWEET_IDS, {"tweet_ids": list(existing_ids)})
+                rows_by_id.update((row["tweet_id"], row) for row in result.mappings().all())
             
-            logger.info(f"Saved tweet {tweet_data['tweet_id']} (sentiment analysis will be done later)")
-            return tweet
+            await session.commit()
         except Exception as e:
             await session.rollback()
-            logger.error(f"Failed to save tweet: {e}")
+            logger.error(f"Failed to save tweets: {e}")
             raise
+        
+        if inserted_ids:
+            logger.info(f"Saved {len(inserted_ids)} new tweet(s) (sentiment analysis will be done later)")
+        return [rows_by_id[tweet_id] for tweet_id in values], inserted_ids
+    
+    async def _fetch_user_tweets(self, username: str, user_id: int, semaphore: asyncio.Semaphore) -> List[Dict]:
+        """Fetch one monitored user's tweets newer than the last cycle once a semaphore slot is free"""
+        async with semaphore:
+            return await self.get_recent_tweets(
+                username,
+                max_results=settings.TWEETS_PER_USER,
+                user_id=user_id,
+                since_id=self._last_tweet_ids.get(self._user_key(username)),
+            )
     
-    async def check_new_tweets(self, session: AsyncSession):
-        """Check for new tweets from monitored users"""
+    async def _advance_last_tweet_ids(self, session: AsyncSession, tweets: List[Dict]):
+        """Record the newest stored tweet per user so the next cycle asks only for newer ones"""
+        newest = {}
+        for tweet in tweets:
+            key = self._user_key(tweet["author_username"])
+            newest[key] = max(newest.get(key, 0), int(tweet["tweet_id"]))
+        if not newest:
+            return
+        
+        self._last_tweet_ids.update(newest)
         try:
-            for username in settings.MONITORED_USERS:
-                try:
-                    tweets = await self.get_recent_tweets(username, max_results=settings.TWEETS_PER_USER)
-                    for tweet_data in tweets:
-                        await self.save_tweet(session, tweet_data)
-                    await asyncio.sleep(1)  # Rate limit protection
-                except TwitterAPIError as e:
-                    # If it's a rate limit error, we already logged it and returned empty list
-                    # Just continue to next user
-                    if "rate limit" in str(e).lower() or "429" in str(e):
-                        continue
-                    raise
+            await session.execute(
+                _ADVANCE_LAST_TWEET_ID,
+                [{"name": name, "newest_id": newest_id} for name, newest_id in newest.items()],
+            )
+            await session.commit()
         except Exception as e:
-            error_msg = str(e)
-            if "429" in error_msg or "rate limit" in error_msg.lower():
-                logger.warning("Twitter API rate limit exceeded. Will retry on next check interval.")
-            else:
-                logger.error(f"Error checking new tweets: {e}")
+            await session.rollback()
+            logger.warning(f"Could not store last seen tweet IDs: {e}")
+    
+    async def check_new_tweets(self):
+        """
+        Fetch stage: check monitored users for new tweets
+        Each user's tweets are queued for the persist stage as soon as they arrive
+        """
+        if not self._has_bearer and not self._has_oauth:
+            logger.error("Twitter API credentials not configured")
+            return
+        
+        try:
+            # Resolve every monitored user up front in batched lookups
+            user_ids = await self.get_user_ids(list(settings.MONITORED_USERS))
+        except RATE_LIMIT_ERRORS:
+            logger.warning("Twitter API rate limit exceeded. Will retry on next check interval.")
+            return
+        except Exception as e:
+            logger.error(f"Error checking new tweets: {e}")
+            return
+        
+        users = []
+        for username in settings.MONITORED_USERS:
+            user_id = user_ids.get(username)
+            if user_id is None:
+                logger.warning(f"User @{username} not found on Twitter")
+                continue
+            users.append((username, user_id))
+        
+        # Fetch concurrently; the semaphore caps requests in flight
+        semaphore = asyncio.Semaphore(settings.TWITTER_MAX_CONCURRENCY)
+        batch_size = settings.TWITTER_SEARCH_BATCH_SIZE
+        if batch_size > 1 and len(users) > 1:
+            # One search request per batch_size users instead of one timeline request each
+            batches = [users[start:start + batch_size] for start in range(0, len(users), batch_size)]
+            fetches = [
+                self._queue_tweets(
+                    ", ".join(username for username, _ in batch),
+                    self._search_users_tweets(batch, semaphore),
+                )
+                for batch in batches
+            ]
+        else:
+            fetches = [
+                self._queue_tweets(username, self._fetch_user_tweets(username, user_id, semaphore))
+                for username, user_id in users
+            ]
+        await asyncio.gather(*fetches)
+    
+    async def _search_users_tweets(self, users: List[Tuple[str, int]], semaphore: asyncio.Semaphore) -> List[Dict]:
+        """Fetch several monitored users' new tweets with one search once a semaphore slot is free"""
+        # One since_id covers the whole search: the oldest, and only if every user has one
+        since_ids = [self._last_tweet_ids.get(self._user_key(username)) for username, _ in users]
+        since_id = None if None in since_ids else min(since_ids)
+        max_results = min(
+            max(settings.TWEETS_PER_USER * len(users), self.SEARCH_MIN_RESULTS),
+            self.SEARCH_MAX_RESULTS,
+        )
+        async with semaphore:
+            return await self._search_recent_tweets(users, max_results=max_results, since_id=since_id)
+    
+    async def _queue_tweets(self, label: str, fetch: Awaitable[List[Dict]]):
+        """Await one fetch of monitored users' new tweets and hand them to the persist stage"""
+        try:
+            tweets = await fetch
+        except Exception as e:
+            # Rate limits were already logged by the fetch; other users still count
+            logger.error(f"Error checking new tweets for {label}: {e}")
+            return
+        if tweets:
+            # Blocks while the persist stage is MONITOR_QUEUE_SIZE batches behind
+            await self._tweet_queue.put(tweets)
+    
+    async def _persist_loop(self):
+        """Persist stage: save queued batches, combining whatever has piled up into one insert"""
+        while True:
+            batches = [await self._tweet_queue.get()]
+            while not self._tweet_queue.empty():
+                batches.append(self._tweet_queue.get_nowait())
+            tweets = [tweet for batch in batches for tweet in batch]
+            try:
+                async with AsyncSessionLocal() as session:
+                    rows, inserted_ids = await self.save_tweets(session, tweets)
+                    await self._advance_last_tweet_ids(session, tweets)
+                new_rows = [(row["id"], row["content"]) for row in rows if row["tweet_id"] in inserted_ids]
+                if new_rows:
+                    await self._sentiment_queue.put(new_rows)
+            except Exception as e:
+                logger.error(f"Error saving monitored tweets: {e}")
+            finally:
+                for _ in batches:
+                    self._tweet_queue.task_done()
+    
+    async def _sentiment_loop(self):
+        """
+        Sentiment stage: analyze newly saved tweets and store the results
+        The models run in a worker thread, so inference never stalls fetching or saving
+        """
+        while True:
+            batches = [await self._sentiment_queue.get()]
+            while not self._sentiment_queue.empty():
+                batches.append(self._sentiment_queue.get_nowait())
+            rows = [row for batch in batches for row in batch]
+            try:
+                sentiments = await asyncio.to_thread(
+                    self.sentiment_service.analyze_batch, [content for _, content in rows]
+                )
+                async with AsyncSessionLocal() as session:
+                    await session.execute(
+                        _SET_SENTIMENT,
+                        [
+                            {"row_id": row_id, "score": sentiment["score"], "label": sentiment["label"]}
+                            for (row_id, _), sentiment in zip(rows, sentiments)
+                        ],
+                    )
+                    await session.commit()
+            except Exception as e:
+                logger.error(f"Error analyzing monitored tweets: {e}")
+            finally:
+                for _ in batches:
+                    self._sentiment_queue.task_done()
     
     async def start_monitoring(self):
-        """Start background monitoring task"""
+        """Start the background fetch, persist and sentiment tasks"""
         if self.is_monitoring:
             logger.warning("Monitoring already started")
             return
         
+        if not self._has_bearer and not self._has_oauth:
+            logger.info("Twitter credentials not configured, monitoring disabled")
+            return
+        
         # Test authentication before starting monitoring
-        if self._has_bearer or self._has_oauth:
-            await self._test_authentication()
+        await self._test_authentication()
+        
+        await self.load_user_ids()
         
         self.is_monitoring = True
+        self.sentiment_task = asyncio.create_task(self._sentiment_loop())
+        self.persist_task = asyncio.create_task(self._persist_loop())
         self.monitoring_task = asyncio.create_task(self._monitoring_loop())
         logger.info("Twitter monitoring started")
     
     async def stop_monitoring(self):
-        """Stop background monitoring task"""
+        """Stop background monitoring, saving batches that were already fetched"""
         self.is_monitoring = False
         if self.monitoring_task:
             self.monitoring_task.cancel()
@@ -284,33 +763,48 @@ class TwitterService:
             except asyncio.CancelledError:
                 pass
         
-        # Close the Twitter client's aiohttp session to clean up connections
+        # Upstream first, so each stage's queue is complete before it is drained
+        await self._drain_stage(self.persist_task, self._tweet_queue, "unsaved")
+        self.persist_task = None
+        await self._drain_stage(self.sentiment_task, self._sentiment_queue, "unanalyzed")
+        self.sentiment_task = None
+        
+        # Close the Twitter client's shared session (recreated if the client is used again)
         try:
-            # tweepy AsyncClient uses aiohttp under the hood
-            # Access the session through the client's _session attribute
-            if hasattr(self.client, '_session') and self.client._session:
-                if not self.client._session.closed:
-                    await self.client._session.close()
-            # Alternative: try accessing through client.client.session
-            elif hasattr(self.client, 'client') and hasattr(self.client.client, 'session'):
-                session = self.client.client.session
-                if session and not session.closed:
-                    await session.close()
+            await self.client.close()
         except Exception as e:
             logger.warning(f"Error closing Twitter client session: {e}")
         
         logger.info("Twitter monitoring stopped")
     
+    async def _drain_stage(self, task: Optional[asyncio.Task], queue: asyncio.Queue, pending: str):
+        """Let a pipeline stage finish its queued batches (up to MONITOR_DRAIN_TIMEOUT), then stop it"""
+        if task is None:
+            return
+        try:
+            await asyncio.wait_for(queue.join(), timeout=self.MONITOR_DRAIN_TIMEOUT)
+        except TimeoutError:
+            logger.warning(f"Dropped {queue.qsize()} {pending} tweet batch(es) on shutdown")
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    
     async def _monitoring_loop(self):
-        """Background monitoring loop"""
-        from app.db.database import AsyncSessionLocal
-        
+        """Background monitoring loop (fetch stage); saving and analysis run concurrently in later stages"""
+        loop = asyncio.get_running_loop()
         while self.is_monitoring:
+            started = loop.time()
             try:
-                async with AsyncSessionLocal() as session:
-                    await self.check_new_tweets(session)
+                await self.check_new_tweets()
             except Exception as e:
                 logger.error(f"Error in monitoring loop: {e}")
             
-            await asyncio.sleep(settings.TWEET_CHECK_INTERVAL)
-
+            # Cycles start every TWEET_CHECK_INTERVAL; while rate limited, not before a window reopens
+            elapsed = loop.time() - started
+            await asyncio.sleep(max(
+                settings.TWEET_CHECK_INTERVAL - elapsed,
+                self.client.seconds_until_reopen(),
+                MIN_CHECK_DELAY,
+            ))
@@ -2,8 +2,16 @@
 Helper utility functions
 """
 
-from typing import Any, Dict
-from datetime import datetime
+import re
+import time
+from typing import Any, Dict, Tuple
+from datetime import datetime, timezone
+
+# (epoch second, ISO-8601 string) of the last formatted timestamp
+_utc_iso_cache: Tuple[int, str] = (0, "")
+
+# 1-5 ASCII letters (str.isalpha would also accept non-Latin letters)
+_SYMBOL_RE = re.compile(r"[A-Za-z]{1,5}")
 
 
 def format_response(data: Any, message: str = "Success") -> Dict[str, Any]:
@@ -11,13 +19,22 @@ def format_response(data: Any, message: str = "Success") -> Dict[str, Any]:
     return {
         "message": message,
         "data": data,
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": utc_now_iso(),
     }
 
 
+def utc_now_iso() -> str:
+    """Current UTC time as ISO-8601 with second precision, formatted at most once per second"""
+    global _utc_iso_cache
+    now = int(time.time())
+    if now != _utc_iso_cache[0]:
+        _utc_iso_cache = (now, datetime.fromtimestamp(now, timezone.utc).isoformat())
+    return _utc_iso_cache[1]
+
+
 def validate_symbol(symbol: str) -> bool:
     """Validate stock symbol format"""
-    return symbol.isalpha() and 1 <= len(symbol) <= 5
+    return isinstance(symbol, str) and _SYMBOL_RE.fullmatch(symbol) is not None
 
 
 def calculate_pnl(entry_price: float, current_price: float, quantity: float) -> float:
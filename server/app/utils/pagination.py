@@ -0,0 +1,58 @@
+"""
+Keyset Pagination Cursors
+Opaque cursors that encode the sort key of the last row on a page, and streaming of large pages
+"""
+
+import base64
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Tuple, Type
+
+import orjson
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Select
+
+from app.db.database import AsyncSessionLocal
+
+# Pages of at least this many rows are streamed instead of buffered
+STREAM_MIN_ROWS = 250
+
+# Rows fetched from the server-side cursor (and encoded) per chunk
+STREAM_CHUNK_ROWS = 200
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode the (timestamp, id) sort key of a page's last row"""
+    raw = orjson.dumps([created_at.isoformat(), row_id])
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor; raises ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = orjson.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+async def stream_json_rows(
+    query: Select,
+    params: Dict[str, Any],
+    model: Type[BaseModel],
+    adapter: TypeAdapter,
+) -> AsyncIterator[bytes]:
+    """
+    Stream the rows of a column query as a JSON array, one chunk per STREAM_CHUNK_ROWS rows
+    Opens its own session: the request's session is closed before a streamed body is sent
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(query.execution_options(yield_per=STREAM_CHUNK_ROWS), params)
+        yield b"["
+        separator = b""
+        async for rows in result.mappings().partitions():
+            # adapter encodes List[model]; strip the brackets to splice the chunk into the array
+            chunk = adapter.dump_json([model.model_construct(**row) for row in rows])
+            yield separator + chunk[1:-1]
+            separator = b","
+        yield b"]"
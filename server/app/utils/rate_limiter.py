@@ -0,0 +1,34 @@
+"""
+Rate Limiting
+Client-side pacing for outbound API calls
+"""
+
+import asyncio
+import time
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket shared by the coroutines calling one API.
+    Holds up to `capacity` tokens refilled at `rate` tokens per second; acquire() takes one,
+    waiting (in arrival order) while the bucket is empty.
+    """
+    
+    def __init__(self, rate: float = 1.0, capacity: int = 60):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait for and consume one token"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
@@ -3,36 +3,69 @@ TradeX Server - Main Application Entry Point
 Production-ready FastAPI server for Twitter-based trading bot
 """
 
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 import uvicorn
 
 from app.core.config import settings
-from app.core.logging import setup_logging
+from app.core.logging import setup_logging, HealthCheckAccessFilter
 from app.api.v1.router import api_router
+from app.api.health_interceptor import HEALTH_PATHS, HealthCheckInterceptor
 from app.db.database import init_db, close_db
+from app.services.http_clients import init_http_client, close_http_client
+from app.services.response_cache import init_response_cache, close_response_cache
+from app.services.reddit_service import RedditService
+from app.services.sentiment_service import SentimentService
 from app.services.trading_service import TradingService
 from app.services.twitter_service import TwitterService
 
 # Setup logging
 logger = setup_logging()
 
+# Size of the event loop's default thread pool
+DEFAULT_EXECUTOR_WORKERS = 16
+
+# Kubernetes probes hit the health paths every few seconds; keep them out of the access log
+logging.getLogger("uvicorn.access").addFilter(
+    HealthCheckAccessFilter(HEALTH_PATHS | {"/health", "/api/v1/health/detailed"})
+)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager for startup and shutdown events"""
     # Startup
-    logger.info("Starting TradeX server...")
+    loop = asyncio.get_running_loop()
+    # "uvloop.Loop" when started with --loop uvloop (Dockerfile, Makefile, __main__)
+    logger.info(f"Starting TradeX server on {type(loop).__module__}.{type(loop).__name__}...")
+    # Worker threads for blocking SDK calls (yfinance, Alpaca) run via asyncio.to_thread
+    loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=DEFAULT_EXECUTOR_WORKERS, thread_name_prefix="tradex-worker")
+    )
+    # Loading the sentiment models takes seconds; do it in a worker thread alongside the other startup work
+    sentiment_loading = asyncio.ensure_future(asyncio.to_thread(SentimentService))
     await init_db()
+    init_http_client()
+    init_response_cache()
     
-    # Initialize services
-    twitter_service = TwitterService()
+    # Initialize services once and share them through app.state
+    sentiment_service = await sentiment_loading
+    app.state.sentiment_service = sentiment_service
+    twitter_service = TwitterService(sentiment_service)
     trading_service = TradingService()
+    app.state.twitter_service = twitter_service
+    app.state.trading_service = trading_service
+    reddit_service = RedditService()
+    app.state.reddit_service = reddit_service
     
     # Start background tasks
     await twitter_service.start_monitoring()
+    await trading_service.start_position_sync()
     
     logger.info("TradeX server started successfully")
     
@@ -41,6 +74,10 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down TradeX server...")
     await twitter_service.stop_monitoring()
+    await trading_service.stop_position_sync()
+    await reddit_service.close()
+    await close_http_client()
+    await close_response_cache()
     await close_db()
     logger.info("TradeX server shut down complete")
 
@@ -53,6 +90,7 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 
@@ -63,6 +101,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -71,7 +110,7 @@ app.add_middleware(
 async def global_exception_handler(request, exc):
     """Global exception handler"""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"detail": "Internal server error"},
     )
@@ -91,21 +130,29 @@ async def root():
     }
 
 
+_HEALTH_BODY = b'{"status":"healthy","service":"TradeX API"}'
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "service": "TradeX API",
-    }
+    return Response(content=_HEALTH_BODY, media_type="application/json")
+
+
+# ASGI entrypoint: health probes are answered before reaching FastAPI
+asgi_app = HealthCheckInterceptor(app)
 
 
 if __name__ == "__main__":
     uvicorn.run(
-        "main:app",
+        "main:asgi_app",
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
+        workers=None if settings.DEBUG else settings.WORKERS,
         log_level="info",
+        access_log=settings.ACCESS_LOG,
+        loop="uvloop",
+        http="httptools",
     )
 
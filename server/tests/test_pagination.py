@@ -0,0 +1,189 @@
+"""
+Keyset pagination cursor tests
+"""
+
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine, insert
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.api.v1.endpoints import trades, tweets
+from app.db.database import Base, get_db
+from app.db.models import Trade, Tweet
+from app.utils import pagination
+from app.utils.pagination import decode_cursor, encode_cursor
+
+# Enough rows for several pages; created_at repeats so page boundaries fall inside ties
+ROW_COUNT = 22
+BASE_TIME = datetime(2024, 5, 17, 14, 30)
+
+
+def _row_time(row_id: int) -> datetime:
+    """Five distinct timestamps, shared by ids spread across the table"""
+    return BASE_TIME + timedelta(seconds=(row_id * 7) % 5)
+
+
+class _StreamedResult:
+    """The part of AsyncResult that stream_json_rows uses, over a buffered result"""
+
+    def __init__(self, result):
+        self._result = result
+
+    def mappings(self):
+        return _StreamedResult(self._result.mappings())
+
+    async def partitions(self, size=None):
+        for rows in self._result.partitions(size):
+            yield rows
+
+
+class _SessionAdapter:
+    """
+    Async facade over a synchronous session on in-memory SQLite
+    Covers what the list endpoints (get_db) and stream_json_rows (AsyncSessionLocal) call
+    """
+
+    def __init__(self, session: Session):
+        self._session = session
+
+    async def execute(self, statement, params=None):
+        return self._session.execute(statement, params)
+
+    async def stream(self, statement, params=None):
+        return _StreamedResult(self._session.execute(statement, params))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+
+@pytest.fixture
+def database(monkeypatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[Tweet.__table__, Trade.__table__])
+    row_ids = range(1, ROW_COUNT + 1)
+    with Session(engine) as session:
+        session.execute(insert(Tweet.__table__), [
+            {
+                "id": row_id,
+                "tweet_id": str(row_id),
+                "author_username": "tester",
+                "content": "text",
+                "created_at": BASE_TIME,
+                "processed": False,
+                "created_at_db": _row_time(row_id),
+            }
+            for row_id in row_ids
+        ])
+        session.execute(insert(Trade.__table__), [
+            {
+                "id": row_id,
+                "symbol": "TSLA",
+                "side": "buy",
+                "quantity": 1.0,
+                "price": 250.0,
+                "status": "filled",
+                "created_at": _row_time(row_id),
+            }
+            for row_id in row_ids
+        ])
+        session.commit()
+
+        adapter = _SessionAdapter(session)
+        monkeypatch.setattr(pagination, "AsyncSessionLocal", lambda: adapter)
+        yield adapter
+    engine.dispose()
+
+
+@pytest.fixture
+async def client(database):
+    app = FastAPI()
+    app.include_router(trades.router, prefix="/trades")
+    app.include_router(tweets.router, prefix="/tweets")
+    app.dependency_overrides[get_db] = lambda: database
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def _walk_pages(client, path: str, limit: int):
+    """Follow X-Next-Cursor from the first page to the last, returning ids and page sizes"""
+    ids, sizes, cursor = [], [], None
+    # A cursor that fails to move past its own page would otherwise loop forever
+    for _ in range(ROW_COUNT + 2):
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get(path, params=params)
+        assert response.status_code == 200
+        page = [row["id"] for row in response.json()]
+        ids.extend(page)
+        sizes.append(len(page))
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            return ids, sizes
+    pytest.fail(f"{path} kept returning X-Next-Cursor after {len(ids)} rows")
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 17, 14, 30, 12, 345678)
+
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(datetime(2024, 5, 17, 14, 30, 12), 2**40)
+
+    assert "=" not in cursor
+    assert "+" not in cursor and "/" not in cursor
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "bnVsbA", "WzFd", "WyJ4IiwxXQ"])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize(
+    ("queries", "sort_key"),
+    [
+        (trades._TRADE_QUERIES, "trades.created_at, trades.id"),
+        (tweets._TWEET_QUERIES, "tweets.created_at_db, tweets.id"),
+    ],
+)
+def test_cursor_queries_seek_on_the_full_sort_key(queries, sort_key):
+    sql = str(queries[False, False, True].compile(dialect=postgresql.dialect()))
+
+    assert f"({sort_key}) < (%(cursor_created_at)s, %(cursor_id)s)" in sql
+    column, id_column = sort_key.split(", ")
+    assert sql.endswith(f"ORDER BY {column} DESC, {id_column} DESC")
+
+
+@pytest.mark.parametrize("path", ["/trades/", "/tweets/"])
+@pytest.mark.parametrize("limit", [1, 3, 4, 7])
+@pytest.mark.parametrize("streamed", [False, True], ids=["buffered", "streamed"])
+async def test_pages_have_no_overlap_or_gap_with_tied_timestamps(client, monkeypatch, path, limit, streamed):
+    # The streamed path probes the boundary row and bounds the page with >= boundary
+    module = trades if path == "/trades/" else tweets
+    monkeypatch.setattr(module, "STREAM_MIN_ROWS", 1 if streamed else 1000)
+
+    ids, sizes = await _walk_pages(client, path, limit)
+
+    expected = sorted(range(1, ROW_COUNT + 1), key=lambda row_id: (_row_time(row_id), row_id), reverse=True)
+    assert ids == expected
+    assert all(size == limit for size in sizes[:-1])
+
+
+async def test_invalid_cursor_returns_400(client):
+    response = await client.get("/trades/", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
@@ -0,0 +1,111 @@
+"""
+Outbound rate limiting tests
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.reddit_service import MAX_RETRY_AFTER, _retry_after_seconds
+from app.utils import rate_limiter
+from app.utils.rate_limiter import AsyncTokenBucket
+
+
+class _FakeClock:
+    """Monotonic clock that only moves when the bucket sleeps or a test advances it"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float):
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(rate_limiter, "asyncio", SimpleNamespace(Lock=asyncio.Lock, sleep=clock.sleep))
+    return clock
+
+
+async def test_bucket_allows_a_burst_up_to_capacity(clock):
+    bucket = AsyncTokenBucket(rate=2.0, capacity=5)
+
+    for _ in range(5):
+        await bucket.acquire()
+
+    assert clock.sleeps == []
+
+
+async def test_bucket_waits_for_a_token_once_empty(clock):
+    bucket = AsyncTokenBucket(rate=2.0, capacity=5)
+    for _ in range(5):
+        await bucket.acquire()
+
+    await bucket.acquire()
+
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+async def test_bucket_refills_at_rate(clock):
+    bucket = AsyncTokenBucket(rate=2.0, capacity=5)
+    for _ in range(5):
+        await bucket.acquire()
+
+    clock.now += 1.0
+    await bucket.acquire()
+    await bucket.acquire()
+    assert clock.sleeps == []
+
+    await bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+async def test_bucket_refill_is_capped_at_capacity(clock):
+    bucket = AsyncTokenBucket(rate=2.0, capacity=3)
+    for _ in range(3):
+        await bucket.acquire()
+
+    clock.now += 60.0
+    for _ in range(3):
+        await bucket.acquire()
+    assert clock.sleeps == []
+
+    await bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+async def test_bucket_paces_concurrent_callers(clock):
+    bucket = AsyncTokenBucket(rate=4.0, capacity=2)
+
+    await asyncio.gather(*(bucket.acquire() for _ in range(6)))
+
+    # Two from the burst, then one token every 1/rate seconds
+    assert clock.now - 1000.0 == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (None, 1.0),
+        ("", 1.0),
+        ("soon", 1.0),
+        ("Wed, 21 Oct 2015 07:28:00 GMT", 1.0),
+        ("2.5", 2.5),
+        ("0", 0.0),
+        ("-5", 1.0),
+        ("nan", 1.0),
+        ("inf", 1.0),
+        ("-inf", 1.0),
+        ("3600", MAX_RETRY_AFTER),
+    ],
+)
+def test_retry_after_seconds(value, expected):
+    assert _retry_after_seconds(value) == expected
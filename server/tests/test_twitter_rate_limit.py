@@ -0,0 +1,80 @@
+"""
+Twitter client rate-limit window tests
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from tweepy.errors import TooManyRequests
+
+from app.core.exceptions import TwitterRateLimitError
+from app.services import twitter_service
+from app.services.twitter_service import RateLimitedAsyncClient, _rate_limit_endpoint
+
+TIMELINE = _rate_limit_endpoint("GET", "/2/users/1/tweets", False)
+
+
+def _headers(remaining: int, reset_in: float):
+    return {"x-rate-limit-remaining": str(remaining), "x-rate-limit-reset": str(time.time() + reset_in)}
+
+
+@pytest.fixture
+async def client():
+    client = RateLimitedAsyncClient(bearer_token="token")
+    yield client
+    await client.close()
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Routes sent to the API; each response reports a fresh window with two requests left"""
+    sent = []
+
+    async def request(self, method, route, params=None, json=None, user_auth=False):
+        sent.append(route)
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(headers=_headers(2, 900))
+
+    monkeypatch.setattr(twitter_service.AsyncClient, "request", request)
+    return sent
+
+
+async def _fetch_timelines(client, count):
+    return await asyncio.gather(
+        *(client.request("GET", f"/2/users/{user_id}/tweets") for user_id in range(1, count + 1)),
+        return_exceptions=True,
+    )
+
+
+async def test_callers_waiting_on_one_window_send_a_single_probe(client, sent):
+    client._rate_limits[TIMELINE] = (0, time.time() + 0.05)
+
+    results = await _fetch_timelines(client, 6)
+
+    # One probe learns the new window, two more fit in it, the rest are refused locally
+    errors = [result for result in results if isinstance(result, Exception)]
+    assert len(sent) == 3
+    assert len(errors) == 3
+    assert all(isinstance(error, TwitterRateLimitError) for error in errors)
+    assert client._window_probes == {}
+
+
+async def test_rejected_probe_closes_the_window_for_waiting_callers(client, monkeypatch):
+    sent = []
+
+    async def request(self, method, route, params=None, json=None, user_auth=False):
+        sent.append(route)
+        await asyncio.sleep(0.01)
+        raise TooManyRequests(SimpleNamespace(status_code=429, reason="", json=dict, headers=_headers(0, 900)))
+
+    monkeypatch.setattr(twitter_service.AsyncClient, "request", request)
+    client._rate_limits[TIMELINE] = (0, time.time() + 0.05)
+
+    results = await _fetch_timelines(client, 4)
+
+    assert len(sent) == 1
+    assert sum(isinstance(result, TooManyRequests) for result in results) == 1
+    assert sum(isinstance(result, TwitterRateLimitError) for result in results) == 3
+    assert client._window_probes == {}